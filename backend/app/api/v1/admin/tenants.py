@@ -4,28 +4,39 @@ Tenant Management API
 Administrative endpoints for managing tenants in multi-tenant deployment.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from datetime import datetime, timedelta
-import uuid
+from sqlalchemy import select, update, delete, func, case, cast, literal, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import raiseload
+from typing import List, Optional, Literal, Annotated, Tuple
+from datetime import datetime, timedelta, timezone
 
+from app.core.cache import cache_key, cache_get, cache_set, cache_invalidate, coalesce
 from app.core.database import get_async_session
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse, dumps_json
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.models.usage_tracking import UsageTracking
 from app.core.exceptions import TenantNotFoundError
 from app.middleware.tenant import get_current_tenant_id
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, StringConstraints
+
+
+# Shared field types, compiled once into the pydantic-core schemas that use
+# them; no per-instance Python validators run for these checks.
+TenantName = Annotated[str, StringConstraints(min_length=2, max_length=50, pattern=r"^[a-z0-9-]+$")]
+BillingPlan = Literal["free", "starter", "professional", "enterprise"]
 
 
 # Pydantic models for tenant management
 class TenantCreate(BaseModel):
-    name: str = Field(..., min_length=2, max_length=50, regex="^[a-z0-9-]+$")
+    name: TenantName
     display_name: str = Field(..., min_length=2, max_length=255)
-    billing_plan: str = Field(default="free", regex="^(free|starter|professional|enterprise)$")
+    billing_plan: BillingPlan = "free"
     quota_storage_bytes: int = Field(default=10737418240)  # 10GB
     quota_processing_hours: int = Field(default=10)
     quota_jobs_per_month: int = Field(default=50)
@@ -34,7 +45,7 @@ class TenantCreate(BaseModel):
 
 class TenantUpdate(BaseModel):
     display_name: Optional[str] = Field(None, min_length=2, max_length=255)
-    billing_plan: Optional[str] = Field(None, regex="^(free|starter|professional|enterprise)$")
+    billing_plan: Optional[BillingPlan] = None
     quota_storage_bytes: Optional[int] = Field(None, gt=0)
     quota_processing_hours: Optional[int] = Field(None, gt=0)
     quota_jobs_per_month: Optional[int] = Field(None, gt=0)
@@ -83,7 +94,84 @@ class TenantSecurityConfig(BaseModel):
     lockout_duration: int = 3600
 
 
-router = APIRouter(prefix="/admin/tenants", tags=["tenant-management"])
+# Response defaults built once from the models, so payloads match their
+# schemas without instantiating a model per request. Fields to_dict() does
+# not provide (the usage statistics) come from here.
+_TENANT_DEFAULTS = {
+    name: field.default
+    for name, field in TenantResponse.model_fields.items()
+    if not field.is_required()
+}
+_SECURITY_DEFAULTS = TenantSecurityConfig().dict()
+
+
+def _now() -> datetime:
+    """Timezone-aware request time, resolved once per request."""
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive query parameters as UTC so they compare against TIMESTAMPTZ."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _usage_sum(resource_type: str):
+    """Conditional SUM so every usage total comes from one pass over the rows."""
+    return func.coalesce(
+        func.sum(
+            case((UsageTracking.resource_type == resource_type, UsageTracking.amount), else_=0)
+        ),
+        0
+    )
+
+
+def _settings_or_empty():
+    """Tenant settings as a JSONB expression, treating NULL as an empty object."""
+    return func.coalesce(Tenant.settings, cast({}, JSONB), type_=JSONB)
+
+
+def _tenant_payload(tenant: Tenant, **extra) -> dict:
+    """Build a trusted TenantResponse-shaped dict from a DB row."""
+    return {**_TENANT_DEFAULTS, **tenant.to_dict(), **extra}
+
+
+# Plain table columns for bulk listings; rows come back as mappings and skip
+# ORM instance construction and the identity map entirely
+TENANT_COLS = tuple(Tenant.__table__.c)
+
+
+def _tenant_page_response(body: bytes, next_cursor: str) -> Response:
+    """Wrap a rendered tenant page, advertising the next cursor if any."""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _stream_tenants_ndjson(db: AsyncSession, query):
+    """Yield one JSON line per tenant while rows are still arriving."""
+    result = await db.stream(query)
+    async for row in result.mappings():
+        yield dumps_json({**_TENANT_DEFAULTS, **row}) + b"\n"
+
+
+# Cached admin reads share one namespace so any tenant write can drop them all.
+# Security config is deliberately never cached.
+TENANT_CACHE_NAMESPACE = "tenants"
+TENANT_LIST_CACHE_TTL = 30
+TENANT_USAGE_CACHE_TTL = 60
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Pages at least this long are serialized off the event loop; below it the
+# thread hand-off costs more than the encoding
+THREADPOOL_SERIALIZE_MIN_ROWS = 200
+
+
+router = APIRouter(
+    prefix="/admin/tenants",
+    tags=["tenant-management"],
+    default_response_class=ORJSONResponse,
+)
 
 
 @router.post("/", response_model=TenantResponse, status_code=status.HTTP_201_CREATED)
@@ -94,9 +182,7 @@ async def create_tenant(
     """Create a new tenant."""
     
     # Check if tenant name already exists
-    query = select(Tenant).where(Tenant.name == tenant_data.name)
-    result = await db.execute(query)
-    existing_tenant = result.scalar_one_or_none()
+    existing_tenant = await db.scalar(select(Tenant.id).where(Tenant.name == tenant_data.name))
     
     if existing_tenant:
         raise HTTPException(
@@ -105,30 +191,53 @@ async def create_tenant(
         )
     
     # Create new tenant
-    tenant = Tenant(
-        id=uuid.uuid4(),
-        **tenant_data.dict()
-    )
+    tenant = Tenant(**tenant_data.dict())
     
     db.add(tenant)
     await db.commit()
     await db.refresh(tenant)
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
     
-    return TenantResponse(**tenant.to_dict())
+    return ORJSONResponse(_tenant_payload(tenant), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=List[TenantResponse])
 async def list_tenants(
-    skip: int = Query(0, ge=0),
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor"),
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    billing_plan: Optional[str] = Query(None),
+    billing_plan: Optional[BillingPlan] = Query(None),
     search: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_async_session)
 ):
-    """List all tenants with pagination and filtering."""
+    """List all tenants with pagination and filtering.
+    
+    Pages are ordered newest first. When a page is full, the cursor for the
+    next one is returned in the ``X-Next-Cursor`` header; ``skip`` is kept
+    only for older clients.
+    
+    Clients sending ``Accept: application/x-ndjson`` get an uncached stream of
+    one tenant per line instead of a single JSON array. Streams carry no
+    cursor header; the last line's ``created_at`` and ``id`` locate the next
+    page.
+    """
     
-    query = select(Tenant)
+    stream = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    
+    if not stream:
+        key = await cache_key(
+            TENANT_CACHE_NAMESPACE, "list", cursor, skip, limit, active_only, billing_plan, search
+        )
+        cached = await cache_get(key)
+        if cached is not None:
+            # Cached as "<next cursor>\n<body>"
+            next_cursor, body = cached.split(b"\n", 1)
+            return _tenant_page_response(body, next_cursor.decode())
+    
+    # user_count is a trigger-maintained column, so no join against users
+    query = select(*TENANT_COLS)
     
     # Apply filters
     if active_only:
@@ -144,25 +253,40 @@ async def list_tenants(
             (Tenant.display_name.ilike(search_term))
         )
     
-    # Add pagination
-    query = query.offset(skip).limit(limit).order_by(Tenant.created_at.desc())
+    # Add pagination; (created_at, id) keyset seeks instead of scanning past skipped rows
+    if cursor:
+        query = query.where(tuple_(Tenant.created_at, Tenant.id) < decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
     
-    result = await db.execute(query)
-    tenants = result.scalars().all()
+    query = query.limit(limit).order_by(Tenant.created_at.desc(), Tenant.id.desc())
     
-    # Get usage statistics for each tenant
-    tenant_responses = []
-    for tenant in tenants:
-        tenant_dict = tenant.to_dict()
+    if stream:
+        return StreamingResponse(
+            _stream_tenants_ndjson(db, query), media_type=NDJSON_MEDIA_TYPE
+        )
+    
+    async def render_page() -> Tuple[bytes, str]:
+        result = await db.execute(query)
+        
+        tenant_responses = [{**_TENANT_DEFAULTS, **row} for row in result.mappings()]
         
-        # Get user count
-        user_count_query = select(func.count(User.id)).where(User.tenant_id == tenant.id)
-        user_count_result = await db.execute(user_count_query)
-        tenant_dict["user_count"] = user_count_result.scalar()
+        next_cursor = ""
+        if len(tenant_responses) == limit:
+            last = tenant_responses[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
         
-        tenant_responses.append(TenantResponse(**tenant_dict))
+        if len(tenant_responses) >= THREADPOOL_SERIALIZE_MIN_ROWS:
+            body = await run_in_threadpool(dumps_json, tenant_responses)
+        else:
+            body = dumps_json(tenant_responses)
+        await cache_set(key, next_cursor.encode() + b"\n" + body, TENANT_LIST_CACHE_TTL)
+        return body, next_cursor
     
-    return tenant_responses
+    # Dashboards poll this from several panels at once; run the query once
+    body, next_cursor = await coalesce(key, render_page)
+    
+    return _tenant_page_response(body, next_cursor)
 
 
 @router.get("/{tenant_id}", response_model=TenantResponse)
@@ -172,9 +296,9 @@ async def get_tenant(
 ):
     """Get tenant details by ID."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
+    tenant = await db.scalar(
+        select(Tenant).where(Tenant.id == tenant_id).options(raiseload("*"))
+    )
     
     if not tenant:
         raise HTTPException(
@@ -182,14 +306,7 @@ async def get_tenant(
             detail="Tenant not found"
         )
     
-    tenant_dict = tenant.to_dict()
-    
-    # Get usage statistics
-    user_count_query = select(func.count(User.id)).where(User.tenant_id == tenant.id)
-    user_count_result = await db.execute(user_count_query)
-    tenant_dict["user_count"] = user_count_result.scalar()
-    
-    return TenantResponse(**tenant_dict)
+    return ORJSONResponse(_tenant_payload(tenant))
 
 
 @router.put("/{tenant_id}", response_model=TenantResponse)
@@ -200,8 +317,17 @@ async def update_tenant(
 ):
     """Update tenant configuration."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
+    # Update tenant with provided fields and read the new row back in one statement
+    update_data = tenant_update.dict(exclude_unset=True)
+    
+    stmt = (
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(**update_data)
+        .returning(Tenant)
+        .options(raiseload("*"))
+    )
+    result = await db.execute(stmt)
     tenant = result.scalar_one_or_none()
     
     if not tenant:
@@ -210,16 +336,10 @@ async def update_tenant(
             detail="Tenant not found"
         )
     
-    # Update tenant with provided fields
-    update_data = tenant_update.dict(exclude_unset=True)
-    
-    for field, value in update_data.items():
-        setattr(tenant, field, value)
-    
     await db.commit()
-    await db.refresh(tenant)
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
     
-    return TenantResponse(**tenant.to_dict())
+    return ORJSONResponse(_tenant_payload(tenant))
 
 
 @router.delete("/{tenant_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -230,35 +350,40 @@ async def delete_tenant(
 ):
     """Delete a tenant (soft delete by default)."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
-    
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tenant not found"
+    if force:
+        # Hard delete
+        stmt = delete(Tenant).where(Tenant.id == tenant_id).returning(Tenant.id)
+    else:
+        # Soft delete, guarded in the same statement so a concurrent user
+        # insert cannot slip between the check and the update
+        has_no_users = ~select(User.id).where(User.tenant_id == Tenant.id).exists()
+        stmt = (
+            update(Tenant)
+            .where(Tenant.id == tenant_id, has_no_users)
+            .values(is_active=False)
+            .returning(Tenant.id)
         )
     
-    # Check if tenant has users
-    user_count_query = select(func.count(User.id)).where(User.tenant_id == tenant.id)
-    user_count_result = await db.execute(user_count_query)
-    user_count = user_count_result.scalar()
+    result = await db.execute(stmt)
     
-    if user_count > 0 and not force:
+    if result.scalar_one_or_none() is None:
+        # Only a miss pays for a second query to tell 404 from 409
+        probe = select(Tenant.id, Tenant.user_count).where(Tenant.id == tenant_id)
+        row = (await db.execute(probe)).first()
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tenant not found"
+            )
+        
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Tenant has {user_count} users. Use force=true to delete anyway."
+            detail=f"Tenant has {row.user_count} users. Use force=true to delete anyway."
         )
     
-    if force:
-        # Hard delete
-        await db.delete(tenant)
-    else:
-        # Soft delete
-        tenant.is_active = False
-    
     await db.commit()
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
 
 
 @router.get("/{tenant_id}/usage", response_model=TenantUsageStats)
@@ -266,54 +391,61 @@ async def get_tenant_usage(
     tenant_id: str,
     period_start: Optional[datetime] = Query(None),
     period_end: Optional[datetime] = Query(None),
+    now: datetime = Depends(_now),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Get tenant usage statistics for a specific period."""
     
-    # Default to current month if no period specified
-    if not period_start:
-        period_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    if not period_end:
-        period_end = datetime.now()
+    # Keyed on the requested period, so open-ended requests may lag by one TTL
+    key = await cache_key(TENANT_CACHE_NAMESPACE, "usage", tenant_id, period_start, period_end)
+    cached = await cache_get(key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
     
-    # Verify tenant exists
-    tenant_query = select(Tenant).where(Tenant.id == tenant_id)
-    tenant_result = await db.execute(tenant_query)
-    tenant = tenant_result.scalar_one_or_none()
+    # Default to current month if no period specified
+    if period_start:
+        period_start = _as_utc(period_start)
+    else:
+        period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tenant not found"
-        )
+    period_end = _as_utc(period_end) if period_end else now
     
-    # Aggregate usage statistics
+    # Aggregate usage statistics; the tenant existence check rides along
+    # because an ungrouped aggregate always yields exactly one row
     usage_query = select(
-        func.sum(UsageTracking.amount).filter(UsageTracking.resource_type == "storage").label("storage_used"),
-        func.sum(UsageTracking.amount).filter(UsageTracking.resource_type == "processing_time").label("processing_hours"),
-        func.count(UsageTracking.id).filter(UsageTracking.resource_type == "job").label("jobs_completed"),
-        func.sum(UsageTracking.amount).filter(UsageTracking.resource_type == "api_calls").label("api_calls"),
-        func.sum(UsageTracking.amount).filter(UsageTracking.resource_type == "bandwidth").label("bandwidth_used")
+        select(Tenant.id).where(Tenant.id == tenant_id).exists().label("tenant_exists"),
+        _usage_sum("storage").label("storage_used"),
+        _usage_sum("processing_time").label("processing_hours"),
+        func.count(case((UsageTracking.resource_type == "job", 1))).label("jobs_completed"),
+        _usage_sum("api_calls").label("api_calls"),
+        _usage_sum("bandwidth").label("bandwidth_used")
     ).where(
-        (UsageTracking.tenant_id == tenant_id) &
-        (UsageTracking.created_at >= period_start) &
-        (UsageTracking.created_at <= period_end)
+        UsageTracking.tenant_id == tenant_id,
+        UsageTracking.created_at.between(period_start, period_end)
     )
     
     usage_result = await db.execute(usage_query)
     usage_row = usage_result.first()
     
-    return TenantUsageStats(
-        tenant_id=tenant_id,
-        period_start=period_start,
-        period_end=period_end,
-        storage_used_bytes=int(usage_row.storage_used or 0),
-        processing_hours_used=float(usage_row.processing_hours or 0),
-        jobs_completed=int(usage_row.jobs_completed or 0),
-        api_calls=int(usage_row.api_calls or 0),
-        bandwidth_used_bytes=int(usage_row.bandwidth_used or 0)
-    )
+    if not usage_row.tenant_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tenant not found"
+        )
+    
+    response = ORJSONResponse({
+        "tenant_id": tenant_id,
+        "period_start": period_start,
+        "period_end": period_end,
+        "storage_used_bytes": int(usage_row.storage_used or 0),
+        "processing_hours_used": float(usage_row.processing_hours or 0),
+        "jobs_completed": int(usage_row.jobs_completed or 0),
+        "api_calls": int(usage_row.api_calls or 0),
+        "bandwidth_used_bytes": int(usage_row.bandwidth_used or 0),
+    })
+    await cache_set(key, response.body, TENANT_USAGE_CACHE_TTL)
+    
+    return response
 
 
 @router.put("/{tenant_id}/security", response_model=dict)
@@ -324,23 +456,29 @@ async def update_tenant_security(
 ):
     """Update tenant security configuration."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
+    # Patch only the security key server-side instead of rewriting settings
+    stmt = (
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(
+            settings=func.jsonb_set(
+                _settings_or_empty(),
+                literal_column("'{security}'::text[]"),
+                cast(security_config.dict(), JSONB)
+            )
+        )
+        .returning(Tenant.id)
+    )
+    result = await db.execute(stmt)
     
-    if not tenant:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    # Update security settings
-    if not tenant.settings:
-        tenant.settings = {}
-    
-    tenant.settings["security"] = security_config.dict()
-    
     await db.commit()
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
     
     return {"message": "Security configuration updated successfully"}
 
@@ -352,80 +490,103 @@ async def get_tenant_security(
 ):
     """Get tenant security configuration."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
+    # Fetch just the security sub-document, not the whole settings blob
+    query = select(Tenant.settings["security"]).where(Tenant.id == tenant_id)
     result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
+    row = result.first()
     
-    if not tenant:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    security_settings = tenant.settings.get("security", {}) if tenant.settings else {}
+    security_settings = row[0] or {}
     
-    return TenantSecurityConfig(**security_settings)
+    # Stored settings were validated on write; only missing keys need defaults
+    return ORJSONResponse({**_SECURITY_DEFAULTS, **security_settings})
 
 
 @router.post("/{tenant_id}/suspend", status_code=status.HTTP_200_OK)
 async def suspend_tenant(
     tenant_id: str,
     reason: str = Query(..., description="Reason for suspension"),
+    now: datetime = Depends(_now),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Suspend a tenant (emergency action)."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
+    # Log suspension reason, merged into settings server-side
+    suspension = {
+        "suspended_at": now.isoformat(),
+        "reason": reason,
+        "suspended_by": "admin"  # In real app, get from JWT
+    }
     
-    if not tenant:
+    stmt = (
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(
+            is_active=False,
+            settings=_settings_or_empty().op("||", return_type=JSONB)(
+                cast({"suspension": suspension}, JSONB)
+            )
+        )
+        .returning(Tenant.name)
+    )
+    result = await db.execute(stmt)
+    tenant_name = result.scalar_one_or_none()
+    
+    if not tenant_name:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    tenant.is_active = False
-    
-    # Log suspension reason
-    if not tenant.settings:
-        tenant.settings = {}
-    
-    tenant.settings["suspension"] = {
-        "suspended_at": datetime.now().isoformat(),
-        "reason": reason,
-        "suspended_by": "admin"  # In real app, get from JWT
-    }
-    
     await db.commit()
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
     
-    return {"message": f"Tenant {tenant.name} has been suspended", "reason": reason}
+    return {"message": f"Tenant {tenant_name} has been suspended", "reason": reason}
 
 
 @router.post("/{tenant_id}/activate", status_code=status.HTTP_200_OK)
 async def activate_tenant(
     tenant_id: str,
+    now: datetime = Depends(_now),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Reactivate a suspended tenant."""
     
-    query = select(Tenant).where(Tenant.id == tenant_id)
-    result = await db.execute(query)
-    tenant = result.scalar_one_or_none()
+    # Remove suspension info, server-side, only if the tenant was suspended
+    settings = _settings_or_empty()
+    reactivated = func.jsonb_build_object("reactivated_at", now.isoformat())
+    
+    stmt = (
+        update(Tenant)
+        .where(Tenant.id == tenant_id)
+        .values(
+            is_active=True,
+            settings=case(
+                (
+                    settings.has_key("suspension"),
+                    settings.op("-", return_type=JSONB)(literal("suspension"))
+                    .op("||", return_type=JSONB)(reactivated)
+                ),
+                else_=settings
+            )
+        )
+        .returning(Tenant.name)
+    )
+    result = await db.execute(stmt)
+    tenant_name = result.scalar_one_or_none()
     
-    if not tenant:
+    if not tenant_name:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    tenant.is_active = True
-    
-    # Remove suspension info
-    if tenant.settings and "suspension" in tenant.settings:
-        del tenant.settings["suspension"]
-        tenant.settings["reactivated_at"] = datetime.now().isoformat()
-    
     await db.commit()
+    await cache_invalidate(TENANT_CACHE_NAMESPACE)
     
-    return {"message": f"Tenant {tenant.name} has been reactivated"}
\ No newline at end of file
+    return {"message": f"Tenant {tenant_name} has been reactivated"}
\ No newline at end of file
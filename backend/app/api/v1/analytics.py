@@ -4,27 +4,188 @@ Analytics and Monitoring Service
 Comprehensive analytics, monitoring, and reporting for global multi-tenant deployment.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, func, text, case, or_, false, bindparam, DateTime
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import asyncio
-from dataclasses import dataclass
+import hashlib
+import logging
+import operator
+import time
 
-from app.core.database import get_async_session
+from app.core.cache import cache_get, cache_set, coalesce, get_redis_client
+from app.core.config import settings
+from app.core.database import get_async_session, AsyncSessionLocal
+from app.core.responses import ORJSONResponse, dumps_json
+from app.core.security import require_role
 from app.models.tenant import Tenant
 from app.models.user import User
-from app.models.usage_tracking import UsageTracking
 from app.models.audit_log import AuditLog
+from app.models.alert_rule import AlertRule
+from app.models.metrics_views import tenant_usage_daily, tenant_user_activity, MV_REFRESHED_AT_KEY
 from app.middleware.tenant import get_current_tenant_id, get_current_tenant
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+import redis.asyncio as redis
 
-router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/analytics",
+    tags=["analytics"],
+    default_response_class=ORJSONResponse,
+)
+
+# Platform-wide aggregates are shared by every dashboard viewer. Global
+# metrics are fresh for GLOBAL_METRICS_TTL seconds, then served stale for up
+# to GLOBAL_METRICS_STALE_TTL more while one background refresh recomputes.
+GLOBAL_METRICS_CACHE_KEY = "analytics:global:v2"
+GLOBAL_ALERTS_CACHE_KEY = "analytics:alerts:v1"
+TOP_TENANTS_CACHE_KEY = "analytics:top_tenants:v1"
+GLOBAL_METRICS_TTL = 30
+GLOBAL_METRICS_STALE_TTL = 30
+DASHBOARD_CACHE_TTL = 30
+
+# Alert rules are evaluated against usage summed over this many days
+ALERT_WINDOW_DAYS = 30
+
+# Tenant metrics may be reused by the caller's browser for a minute, then
+# revalidated against an ETag that changes with each view refresh and minute.
+# Private: the data is tenant-scoped, so shared caches must not store it.
+TENANT_METRICS_CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+
+# Each API process runs a refresher that republishes global metrics and
+# alerts every ANALYTICS_REFRESH_INTERVAL seconds; the lock lets only one
+# process do the work per interval. Publishing to the channel forces an
+# immediate refresh, at most once per ANALYTICS_MANUAL_REFRESH_MIN_AGE
+# seconds after the last one started.
+ANALYTICS_REFRESH_CHANNEL = "analytics:refresh"
+ANALYTICS_REFRESH_LOCK_KEY = "analytics:refresh:lock"
+ANALYTICS_MANUAL_REFRESH_MIN_AGE = 5
+
+# Strong references keep fire-and-forget refreshes from being collected
+_background_tasks = set()
+
+# Fixed-shape statements are built once per process; per-call values are
+# bound at execution time so each request skips expression construction.
+# Activity windows are bucketed when the view refreshes, so per-tenant user
+# metrics are a single-row index lookup
+_user_activity = tenant_user_activity.c
+_USER_METRICS_STMT = select(
+    _user_activity.total_users,
+    _user_activity.active_users_24h,
+    _user_activity.active_users_7d,
+    _user_activity.active_users_30d,
+    _user_activity.new_users_7d
+).where(
+    _user_activity.tenant_id == bindparam("tenant_id")
+)
+
+# Sum the precomputed daily rollup instead of scanning usage_tracking;
+# resolution is whole days and lags by at most one view refresh
+_daily = tenant_usage_daily.c
+_USAGE_METRICS_STMT = select(
+    func.sum(_daily.storage_used).label("storage_used"),
+    func.sum(_daily.processing_hours).label("processing_hours"),
+    func.sum(_daily.api_calls).label("api_calls"),
+    func.sum(_daily.bandwidth_used).label("bandwidth_used")
+).where(
+    _daily.tenant_id == bindparam("tenant_id"),
+    _daily.day >= func.date_trunc("day", bindparam("period_start", type_=DateTime(timezone=True)))
+)
+
+_ACTIVE_TENANTS_STMT = select(func.count(Tenant.id)).where(Tenant.is_active == True)
+_ACTIVE_USERS_STMT = select(func.count(User.id)).where(User.is_active == True)
+_NEW_TENANTS_STMT = select(func.count(Tenant.id)).where(
+    (Tenant.created_at >= bindparam("since")) & (Tenant.is_active == True)
+)
+_NEW_USERS_STMT = select(func.count(User.id)).where(
+    (User.created_at >= bindparam("since")) & (User.is_active == True)
+)
+
+# Regional breakdown. Tenants and users are aggregated separately:
+# counting both over a tenant-user join repeats each tenant per user.
+_region = func.coalesce(Tenant.region, 'unknown').label('region')
+_REGIONAL_TENANTS_STMT = select(
+    _region,
+    func.count(Tenant.id).label('tenant_count')
+).where(
+    Tenant.is_active == True
+).group_by(_region)
+_REGIONAL_USERS_STMT = select(
+    _region,
+    func.count(User.id).label('user_count')
+).select_from(
+    User.__table__.join(Tenant.__table__, Tenant.id == User.tenant_id)
+).where(
+    Tenant.is_active == True
+).group_by(_region)
+
+# Reads the trigger-maintained user_count through its partial index
+_TOP_TENANTS_STMT = select(
+    Tenant.id,
+    Tenant.display_name,
+    Tenant.user_count
+).where(
+    Tenant.is_active == True
+).order_by(
+    Tenant.user_count.desc()
+).limit(10)
+
+ALERT_METRICS = ("storage_used_gb", "processing_hours", "api_calls", "bandwidth_used_gb")
+ALERT_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def _build_alerts_stmt(tenant_scoped: bool):
+    """Join active alert rules against windowed usage; only firing rows match."""
+    
+    usage = select(
+        _daily.tenant_id,
+        (func.sum(_daily.storage_used) / 1024**3).label("storage_used_gb"),
+        func.sum(_daily.processing_hours).label("processing_hours"),
+        func.sum(_daily.api_calls).label("api_calls"),
+        (func.sum(_daily.bandwidth_used) / 1024**3).label("bandwidth_used_gb")
+    ).where(
+        _daily.day >= func.date_trunc("day", bindparam("window_start", type_=DateTime(timezone=True)))
+    ).group_by(_daily.tenant_id)
+    if tenant_scoped:
+        usage = usage.where(_daily.tenant_id == bindparam("tenant_id"))
+    usage = usage.subquery()
+    
+    value = case(*((AlertRule.metric == metric, usage.c[metric]) for metric in ALERT_METRICS))
+    fired = case(
+        *((AlertRule.operator == op, compare(value, AlertRule.threshold))
+          for op, compare in ALERT_OPERATORS.items()),
+        else_=false()
+    )
+    
+    return select(
+        AlertRule.name,
+        AlertRule.severity,
+        AlertRule.metric,
+        AlertRule.operator,
+        AlertRule.threshold,
+        usage.c.tenant_id,
+        value.label("value")
+    ).join_from(
+        usage,
+        AlertRule,
+        or_(AlertRule.tenant_id.is_(None), AlertRule.tenant_id == usage.c.tenant_id)
+    ).where(
+        AlertRule.is_active == True,
+        fired
+    )
+
+
+_ALERTS_STMT = _build_alerts_stmt(tenant_scoped=False)
+_TENANT_ALERTS_STMT = _build_alerts_stmt(tenant_scoped=True)
 
 
 class TenantMetrics(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     tenant_id: str
     tenant_name: str
     region: str
@@ -55,6 +216,8 @@ class TenantMetrics(BaseModel):
 
 
 class GlobalMetrics(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     timestamp: datetime
     
     # Global totals
@@ -101,142 +264,73 @@ class RegionalMetrics(BaseModel):
     network_io_mbps: float
 
 
-@dataclass
-class AlertRule:
-    name: str
-    condition: str
-    threshold: float
-    severity: str  # critical, warning, info
-    tenant_id: Optional[str] = None
-    region: Optional[str] = None
-
-
 class AnalyticsService:
-    """Service for collecting and analyzing application metrics."""
+    """Service for collecting and analyzing application metrics.
     
-    def __init__(self, db: AsyncSession):
-        self.db = db
-        self.alert_rules = self._get_default_alert_rules()
+    Statements and alert rules are module or database state, so an instance
+    only carries its sessions and is cheap to build per request.
+    """
     
-    def _get_default_alert_rules(self) -> List[AlertRule]:
-        """Define default alert rules for monitoring."""
-        return [
-            AlertRule("high_error_rate", "error_rate > threshold", 5.0, "critical"),
-            AlertRule("high_response_time", "avg_response_time > threshold", 2000.0, "warning"),
-            AlertRule("low_uptime", "uptime < threshold", 99.0, "critical"),
-            AlertRule("high_storage_usage", "storage_usage > threshold", 90.0, "warning"),
-            AlertRule("quota_exceeded", "usage > quota", 100.0, "critical"),
-        ]
+    __slots__ = ("db", "session_factory")
+    
+    def __init__(self, db: AsyncSession, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.db = db
+        # Independent sub-queries get their own sessions so they can run
+        # concurrently; one asyncpg connection serves one query at a time
+        self.session_factory = session_factory
     
     async def get_tenant_metrics(self, tenant_id: str, period_days: int = 30) -> TenantMetrics:
         """Get comprehensive metrics for a specific tenant."""
         
-        period_start = datetime.now() - timedelta(days=period_days)
+        # One UTC timestamp per request; every window is derived from it
+        now = datetime.now(timezone.utc)
+        period_start = now - timedelta(days=period_days)
         
         # Get tenant info
-        tenant_query = select(Tenant).where(Tenant.id == tenant_id)
-        tenant_result = await self.db.execute(tenant_query)
-        tenant = tenant_result.scalar_one_or_none()
+        tenant = await self.db.scalar(select(Tenant).where(Tenant.id == tenant_id))
         
         if not tenant:
             raise HTTPException(status_code=404, detail="Tenant not found")
         
-        # User metrics
-        user_metrics = await self._get_user_metrics(tenant_id, period_start)
-        
-        # Usage metrics
-        usage_metrics = await self._get_usage_metrics(tenant_id, period_start)
-        
-        # Performance metrics
-        perf_metrics = await self._get_performance_metrics(tenant_id, period_start)
-        
-        # Business metrics
-        business_metrics = await self._get_business_metrics(tenant_id, period_start)
+        # User, usage, performance and business metrics are independent
+        user_metrics, usage_metrics, perf_metrics, business_metrics = await asyncio.gather(
+            self._get_user_metrics(tenant_id),
+            self._get_usage_metrics(tenant_id, period_start),
+            self._get_performance_metrics(tenant_id, period_start),
+            self._get_business_metrics(tenant_id, period_start)
+        )
         
         return TenantMetrics(
             tenant_id=tenant_id,
             tenant_name=tenant.display_name,
-            region=tenant.settings.get("region", "unknown"),
+            region=tenant.region or "unknown",
             **user_metrics,
             **usage_metrics,
             **perf_metrics,
             **business_metrics
         )
     
-    async def _get_user_metrics(self, tenant_id: str, period_start: datetime) -> Dict[str, int]:
-        """Get user-related metrics for a tenant."""
-        
-        # Total users
-        total_users_query = select(func.count(User.id)).where(
-            User.tenant_id == tenant_id
-        )
-        total_users_result = await self.db.execute(total_users_query)
-        total_users = total_users_result.scalar() or 0
-        
-        # Active users (based on last_login)
-        now = datetime.now()
+    async def _get_user_metrics(self, tenant_id: str) -> Dict[str, int]:
+        """Get user-related metrics for a tenant as of the last view refresh."""
         
-        active_24h_query = select(func.count(User.id)).where(
-            (User.tenant_id == tenant_id) &
-            (User.last_login >= now - timedelta(hours=24))
-        )
-        active_24h_result = await self.db.execute(active_24h_query)
-        active_users_24h = active_24h_result.scalar() or 0
+        async with self.session_factory() as session:
+            user_result = await session.execute(_USER_METRICS_STMT, {"tenant_id": tenant_id})
+            user_row = user_result.first()
         
-        active_7d_query = select(func.count(User.id)).where(
-            (User.tenant_id == tenant_id) &
-            (User.last_login >= now - timedelta(days=7))
-        )
-        active_7d_result = await self.db.execute(active_7d_query)
-        active_users_7d = active_7d_result.scalar() or 0
+        if user_row is None:
+            # Tenants without users are absent from the view
+            return dict.fromkeys(user_result.keys(), 0)
         
-        active_30d_query = select(func.count(User.id)).where(
-            (User.tenant_id == tenant_id) &
-            (User.last_login >= now - timedelta(days=30))
-        )
-        active_30d_result = await self.db.execute(active_30d_query)
-        active_users_30d = active_30d_result.scalar() or 0
-        
-        # New users in last 7 days
-        new_users_7d_query = select(func.count(User.id)).where(
-            (User.tenant_id == tenant_id) &
-            (User.created_at >= now - timedelta(days=7))
-        )
-        new_users_7d_result = await self.db.execute(new_users_7d_query)
-        new_users_7d = new_users_7d_result.scalar() or 0
-        
-        return {
-            "total_users": total_users,
-            "active_users_24h": active_users_24h,
-            "active_users_7d": active_users_7d,
-            "active_users_30d": active_users_30d,
-            "new_users_7d": new_users_7d
-        }
+        return dict(user_row._mapping)
     
     async def _get_usage_metrics(self, tenant_id: str, period_start: datetime) -> Dict[str, float]:
         """Get usage metrics for a tenant."""
         
-        # Aggregate usage from usage_tracking table
-        usage_query = select(
-            func.sum(UsageTracking.amount).filter(
-                UsageTracking.resource_type == "storage"
-            ).label("storage_used"),
-            func.sum(UsageTracking.amount).filter(
-                UsageTracking.resource_type == "processing_time"
-            ).label("processing_hours"),
-            func.sum(UsageTracking.amount).filter(
-                UsageTracking.resource_type == "api_calls"
-            ).label("api_calls"),
-            func.sum(UsageTracking.amount).filter(
-                UsageTracking.resource_type == "bandwidth"
-            ).label("bandwidth_used")
-        ).where(
-            (UsageTracking.tenant_id == tenant_id) &
-            (UsageTracking.created_at >= period_start)
-        )
-        
-        usage_result = await self.db.execute(usage_query)
-        usage_row = usage_result.first()
+        async with self.session_factory() as session:
+            usage_result = await session.execute(
+                _USAGE_METRICS_STMT, {"tenant_id": tenant_id, "period_start": period_start}
+            )
+            usage_row = usage_result.first()
         
         return {
             "storage_used_gb": float(usage_row.storage_used or 0) / (1024**3),
@@ -268,50 +362,76 @@ class AnalyticsService:
             "churn_rate_percent": 2.1
         }
     
+    async def _fetch_all(self, query, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Run a read query on its own session so it can overlap with others."""
+        async with self.session_factory() as session:
+            result = await session.execute(query, params)
+            return result.all()
+    
     async def get_global_metrics(self) -> GlobalMetrics:
+        """Get global platform metrics, served from Redis when available."""
+        
+        cached = await cache_get(GLOBAL_METRICS_CACHE_KEY)
+        if cached is not None:
+            metrics = GlobalMetrics.model_validate_json(cached)
+            age = (datetime.now(timezone.utc) - metrics.timestamp).total_seconds()
+            if age > GLOBAL_METRICS_TTL:
+                self._schedule_global_metrics_refresh()
+            return metrics
+        
+        return await coalesce(GLOBAL_METRICS_CACHE_KEY, self._refresh_global_metrics)
+    
+    async def _refresh_global_metrics(self) -> GlobalMetrics:
+        """Recompute global metrics and store them in the cache."""
+        
+        metrics = await self._compute_global_metrics()
+        await cache_set(
+            GLOBAL_METRICS_CACHE_KEY,
+            metrics.model_dump_json(),
+            GLOBAL_METRICS_TTL + GLOBAL_METRICS_STALE_TTL
+        )
+        return metrics
+    
+    def _schedule_global_metrics_refresh(self) -> None:
+        """Refresh stale global metrics without making the caller wait."""
+        
+        async def refresh():
+            # The request's session may be closed by the time this runs
+            async with self.session_factory() as session:
+                service = AnalyticsService(session, self.session_factory)
+                await coalesce(GLOBAL_METRICS_CACHE_KEY, service._refresh_global_metrics)
+        
+        task = asyncio.create_task(refresh())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    
+    async def _compute_global_metrics(self) -> GlobalMetrics:
         """Get global platform metrics across all tenants and regions."""
         
-        # Get total counts
-        total_tenants_query = select(func.count(Tenant.id)).where(Tenant.is_active == True)
-        total_tenants_result = await self.db.execute(total_tenants_query)
-        total_tenants = total_tenants_result.scalar() or 0
+        now = datetime.now(timezone.utc)
         
-        total_users_query = select(func.count(User.id)).where(User.is_active == True)
-        total_users_result = await self.db.execute(total_users_query)
-        total_users = total_users_result.scalar() or 0
+        # Get total counts
+        total_tenants = await self.db.scalar(_ACTIVE_TENANTS_STMT) or 0
+        total_users = await self.db.scalar(_ACTIVE_USERS_STMT) or 0
         
         # Get regional breakdown
-        regional_query = select(
-            func.coalesce(Tenant.settings['region'].astext, 'unknown').label('region'),
-            func.count(Tenant.id).label('tenant_count'),
-            func.count(User.id).label('user_count')
-        ).select_from(
-            Tenant.__table__.join(User.__table__, Tenant.id == User.tenant_id)
-        ).where(
-            Tenant.is_active == True
-        ).group_by(
-            Tenant.settings['region'].astext
+        tenant_rows, user_rows = await asyncio.gather(
+            self._fetch_all(_REGIONAL_TENANTS_STMT),
+            self._fetch_all(_REGIONAL_USERS_STMT)
         )
         
-        regional_result = await self.db.execute(regional_query)
-        regional_data = {row.region: {"tenants": row.tenant_count, "users": row.user_count} 
-                        for row in regional_result}
+        regional_data = {
+            row.region: {"tenants": row.tenant_count, "users": 0}
+            for row in tenant_rows
+        }
+        for row in user_rows:
+            regional_data.setdefault(row.region, {"tenants": 0, "users": 0})["users"] = row.user_count
         
         # Calculate growth metrics
-        now = datetime.now()
         week_ago = now - timedelta(days=7)
         
-        new_tenants_query = select(func.count(Tenant.id)).where(
-            (Tenant.created_at >= week_ago) & (Tenant.is_active == True)
-        )
-        new_tenants_result = await self.db.execute(new_tenants_query)
-        new_tenants_7d = new_tenants_result.scalar() or 0
-        
-        new_users_query = select(func.count(User.id)).where(
-            (User.created_at >= week_ago) & (User.is_active == True)
-        )
-        new_users_result = await self.db.execute(new_users_query)
-        new_users_7d = new_users_result.scalar() or 0
+        new_tenants_7d = await self.db.scalar(_NEW_TENANTS_STMT, {"since": week_ago}) or 0
+        new_users_7d = await self.db.scalar(_NEW_USERS_STMT, {"since": week_ago}) or 0
         
         return GlobalMetrics(
             timestamp=now,
@@ -330,75 +450,38 @@ class AnalyticsService:
         )
     
     async def check_alerts(self, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Check for alerts based on defined rules."""
+        """Check alert rules for one tenant, or sweep every tenant.
         
-        alerts = []
+        Rules are joined against usage totals in a single query, so only
+        the (rule, tenant) pairs that fire come back from the database.
+        """
         
-        # Get metrics for alert checking
+        now = datetime.now(timezone.utc)
+        params = {"window_start": now - timedelta(days=ALERT_WINDOW_DAYS)}
         if tenant_id:
-            metrics = await self.get_tenant_metrics(tenant_id)
-            
-            # Check tenant-specific alerts
-            for rule in self.alert_rules:
-                if rule.tenant_id and rule.tenant_id != tenant_id:
-                    continue
-                
-                alert = await self._evaluate_alert_rule(rule, metrics)
-                if alert:
-                    alerts.append(alert)
+            alerts_stmt = _TENANT_ALERTS_STMT
+            params["tenant_id"] = tenant_id
         else:
-            # Check global alerts
-            global_metrics = await self.get_global_metrics()
-            
-            for rule in self.alert_rules:
-                if rule.tenant_id:  # Skip tenant-specific rules
-                    continue
-                
-                alert = await self._evaluate_global_alert_rule(rule, global_metrics)
-                if alert:
-                    alerts.append(alert)
-        
-        return alerts
-    
-    async def _evaluate_alert_rule(self, rule: AlertRule, metrics: TenantMetrics) -> Optional[Dict[str, Any]]:
-        """Evaluate an alert rule against tenant metrics."""
+            alerts_stmt = _ALERTS_STMT
         
-        # Simple rule evaluation (in practice, use a proper rule engine)
-        if rule.name == "high_error_rate" and metrics.error_rate_percent > rule.threshold:
-            return {
-                "rule": rule.name,
-                "severity": rule.severity,
-                "message": f"Error rate {metrics.error_rate_percent:.2f}% exceeds threshold {rule.threshold}%",
-                "tenant_id": metrics.tenant_id,
-                "timestamp": datetime.now(),
-                "value": metrics.error_rate_percent
-            }
-        
-        if rule.name == "high_response_time" and metrics.avg_response_time_ms > rule.threshold:
-            return {
-                "rule": rule.name,
-                "severity": rule.severity,
-                "message": f"Response time {metrics.avg_response_time_ms:.0f}ms exceeds threshold {rule.threshold}ms",
-                "tenant_id": metrics.tenant_id,
-                "timestamp": datetime.now(),
-                "value": metrics.avg_response_time_ms
-            }
+        result = await self.db.execute(alerts_stmt, params)
         
-        return None
-    
-    async def _evaluate_global_alert_rule(self, rule: AlertRule, metrics: GlobalMetrics) -> Optional[Dict[str, Any]]:
-        """Evaluate an alert rule against global metrics."""
-        
-        if rule.name == "global_high_error_rate" and metrics.error_rate_percent > rule.threshold:
-            return {
-                "rule": rule.name,
-                "severity": rule.severity,
-                "message": f"Global error rate {metrics.error_rate_percent:.2f}% exceeds threshold {rule.threshold}%",
-                "timestamp": datetime.now(),
-                "value": metrics.error_rate_percent
+        return [
+            {
+                "rule": row.name,
+                "severity": row.severity,
+                "message": f"{row.metric} {float(row.value):.2f} {row.operator} threshold {row.threshold}",
+                "tenant_id": str(row.tenant_id),
+                "timestamp": now,
+                "value": float(row.value)
             }
-        
-        return None
+            for row in result
+        ]
+
+
+def get_analytics_service(db: AsyncSession = Depends(get_async_session)) -> AnalyticsService:
+    """Request-scoped AnalyticsService bound to the request's session."""
+    return AnalyticsService(db)
 
 
 # API Endpoints
@@ -406,72 +489,188 @@ class AnalyticsService:
 @router.get("/tenants/{tenant_id}/metrics", response_model=TenantMetrics)
 async def get_tenant_analytics(
     tenant_id: str,
+    request: Request,
+    response: Response,
     period_days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_async_session)
+    analytics: AnalyticsService = Depends(get_analytics_service)
 ):
     """Get analytics metrics for a specific tenant."""
     
-    analytics = AnalyticsService(db)
-    return await analytics.get_tenant_metrics(tenant_id, period_days)
+    headers = {
+        "ETag": await _tenant_metrics_etag(tenant_id, period_days),
+        "Cache-Control": TENANT_METRICS_CACHE_CONTROL
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    metrics = await analytics.get_tenant_metrics(tenant_id, period_days)
+    response.headers.update(headers)
+    return metrics
 
 
 @router.get("/global/metrics", response_model=GlobalMetrics)
 async def get_global_analytics(
-    db: AsyncSession = Depends(get_async_session)
+    analytics: AnalyticsService = Depends(get_analytics_service)
 ):
     """Get global platform analytics."""
     
-    analytics = AnalyticsService(db)
+    # Normally a pure read of what the background refresher published
+    cached = await cache_get(GLOBAL_METRICS_CACHE_KEY)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     return await analytics.get_global_metrics()
 
 
 @router.get("/alerts")
 async def get_alerts(
     tenant_id: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_async_session)
+    analytics: AnalyticsService = Depends(get_analytics_service)
 ):
     """Get current alerts for tenant or globally."""
     
-    analytics = AnalyticsService(db)
-    return await analytics.check_alerts(tenant_id)
+    if tenant_id:
+        return await analytics.check_alerts(tenant_id)
+    
+    cached = await cache_get(GLOBAL_ALERTS_CACHE_KEY)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    return await _get_cached_global_alerts(analytics)
+
+
+@router.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def request_analytics_refresh(
+    current_user: dict = Depends(require_role("admin"))
+):
+    """Ask the background refresher to recompute dashboard data now (admin only)."""
+    
+    try:
+        client = get_redis_client()
+        # The lock is set with the interval as its TTL when a refresh starts
+        ttl = await client.ttl(ANALYTICS_REFRESH_LOCK_KEY)
+        age = settings.ANALYTICS_REFRESH_INTERVAL - ttl
+        if ttl > 0 and age < ANALYTICS_MANUAL_REFRESH_MIN_AGE:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Analytics were refreshed moments ago",
+                headers={"Retry-After": str(ANALYTICS_MANUAL_REFRESH_MIN_AGE - age)}
+            )
+        await client.delete(ANALYTICS_REFRESH_LOCK_KEY)
+        await client.publish(ANALYTICS_REFRESH_CHANNEL, b"refresh")
+    except redis.RedisError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Refresh could not be requested: {e}"
+        )
+    
+    return {"status": "refresh requested"}
 
 
 @router.get("/health/dashboard")
 async def get_health_dashboard(
-    db: AsyncSession = Depends(get_async_session)
+    analytics: AnalyticsService = Depends(get_analytics_service)
 ):
     """Get health dashboard data for operations team."""
     
-    analytics = AnalyticsService(db)
-    
     # Get key health indicators
     global_metrics = await analytics.get_global_metrics()
+    alerts = await _get_cached_global_alerts(analytics)
+    
+    # Assembled as plain data and rendered by orjson directly, skipping
+    # FastAPI's jsonable_encoder pass over the nested models
+    return ORJSONResponse({
+        "global_metrics": global_metrics.model_dump(),
+        "active_alerts": len([a for a in alerts if a.get("severity") in ["critical", "warning"]]),
+        "top_tenants": await _get_cached_top_tenants(analytics.db),
+        "system_health": "healthy" if global_metrics.global_uptime_percent > 99.0 else "degraded"
+    })
+
+
+async def _tenant_metrics_etag(tenant_id: str, period_days: int) -> str:
+    """Weak ETag for tenant metrics: changes with each view refresh and each minute."""
+    
+    refreshed_at = await cache_get(MV_REFRESHED_AT_KEY) or b""
+    minute = int(time.time() // 60)
+    digest = hashlib.blake2b(
+        f"{tenant_id}:{period_days}:{refreshed_at.decode()}:{minute}".encode(),
+        digest_size=8
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+async def _get_cached_global_alerts(analytics: AnalyticsService) -> List[Dict[str, Any]]:
+    """Global alerts, recomputed at most once per DASHBOARD_CACHE_TTL."""
+    
+    cached = await cache_get(GLOBAL_ALERTS_CACHE_KEY)
+    if cached is not None:
+        return json.loads(cached)
+    
     alerts = await analytics.check_alerts()
+    await cache_set(GLOBAL_ALERTS_CACHE_KEY, dumps_json(alerts), DASHBOARD_CACHE_TTL)
+    return alerts
+
+
+async def _get_cached_top_tenants(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Top tenants by user count, recomputed at most once per DASHBOARD_CACHE_TTL."""
     
-    # Get top tenants by usage
-    top_tenants_query = select(
-        Tenant.id,
-        Tenant.display_name,
-        func.count(User.id).label('user_count')
-    ).select_from(
-        Tenant.__table__.join(User.__table__, Tenant.id == User.tenant_id)
-    ).where(
-        Tenant.is_active == True
-    ).group_by(
-        Tenant.id, Tenant.display_name
-    ).order_by(
-        func.count(User.id).desc()
-    ).limit(10)
-    
-    top_tenants_result = await db.execute(top_tenants_query)
+    cached = await cache_get(TOP_TENANTS_CACHE_KEY)
+    if cached is not None:
+        return json.loads(cached)
+    
+    top_tenants_result = await db.execute(_TOP_TENANTS_STMT)
     top_tenants = [
-        {"tenant_id": row.id, "name": row.display_name, "users": row.user_count}
+        {"tenant_id": str(row.id), "name": row.display_name, "users": row.user_count}
         for row in top_tenants_result
     ]
     
-    return {
-        "global_metrics": global_metrics,
-        "active_alerts": len([a for a in alerts if a.get("severity") in ["critical", "warning"]]),
-        "top_tenants": top_tenants,
-        "system_health": "healthy" if global_metrics.global_uptime_percent > 99.0 else "degraded"
-    }
\ No newline at end of file
+    await cache_set(TOP_TENANTS_CACHE_KEY, dumps_json(top_tenants), DASHBOARD_CACHE_TTL)
+    return top_tenants
+
+
+async def refresh_analytics_cache() -> None:
+    """Recompute global metrics and alerts and publish them to Redis."""
+    
+    async with AsyncSessionLocal() as session:
+        analytics = AnalyticsService(session)
+        await coalesce(GLOBAL_METRICS_CACHE_KEY, analytics._refresh_global_metrics)
+        alerts = await analytics.check_alerts()
+    
+    await cache_set(GLOBAL_ALERTS_CACHE_KEY, dumps_json(alerts), DASHBOARD_CACHE_TTL)
+
+
+async def _wait_for_refresh_request(pubsub, timeout: float) -> None:
+    """Sleep up to timeout seconds, returning early on a manual refresh request."""
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while (remaining := deadline - loop.time()) > 0:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+        if message is not None:
+            return
+
+
+async def run_analytics_refresher() -> None:
+    """Keep dashboard caches warm until cancelled; started from the app lifespan."""
+    
+    interval = settings.ANALYTICS_REFRESH_INTERVAL
+    client = get_redis_client()
+    pubsub = client.pubsub()
+    
+    try:
+        while True:
+            try:
+                if not pubsub.subscribed:
+                    await pubsub.subscribe(ANALYTICS_REFRESH_CHANNEL)
+                if await client.set(ANALYTICS_REFRESH_LOCK_KEY, b"1", nx=True, ex=interval):
+                    await refresh_analytics_cache()
+                await _wait_for_refresh_request(pubsub, interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Endpoints fall back to computing on demand meanwhile
+                logger.warning(f"Analytics refresh failed: {e}")
+                await asyncio.sleep(interval)
+    finally:
+        await pubsub.reset()
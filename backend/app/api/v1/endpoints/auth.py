@@ -4,16 +4,23 @@ Authentication Endpoints
 User registration, login, token refresh, and logout functionality.
 """
 
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel, EmailStr, validator
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from pydantic import BaseModel, ConfigDict, EmailStr, validator
 
+from app.core.cache import cache_get, cache_set, cache_delete, cache_incr, take_token
+from app.core.config import settings
 from app.core.database import get_db_session
 from app.core.security import (
-    verify_password, 
+    verify_and_update_password,
     get_password_hash, 
     create_access_token, 
     create_refresh_token,
@@ -26,7 +33,7 @@ from app.core.security import (
 from app.models.user import User
 from app.models.tenant import Tenant
 from app.models.user_session import UserSession
-from app.core.exceptions import AuthenticationException, ValidationException
+from app.core.exceptions import AuthenticationException, ValidationException, RateLimitExceededError
 
 router = APIRouter()
 
@@ -69,15 +76,58 @@ class RefreshTokenRequest(BaseModel):
 
 
 class UserResponse(BaseModel):
-    id: str
+    # Validated straight from ORM attributes, without a to_dict() round-trip
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
     email: str
-    tenant_id: str
+    tenant_id: uuid.UUID
     first_name: str = None
     last_name: str = None
     roles: list[str]
     is_active: bool
     email_verified: bool
-    created_at: str
+    created_at: datetime
+
+
+def _session_cache_key(jti: str) -> str:
+    """Redis key holding the /me payload for one access token."""
+    return f"session:{jti}"
+
+
+def _user_response_json(user: User) -> bytes:
+    """Render a user the way /me returns it."""
+    return UserResponse.model_validate(user).model_dump_json().encode()
+
+
+async def _cache_user_session(jti: str, user: User, ttl: int) -> bytes:
+    """Cache the /me payload for an access token for the rest of its lifetime."""
+    body = _user_response_json(user)
+    if ttl > 0:
+        await cache_set(_session_cache_key(jti), body, ttl)
+    return body
+
+
+def _login_failures_key(email: str, client_ip: str) -> str:
+    """Redis counter of consecutive failed passwords for an email from one IP.
+    
+    Scoped to the source so failures sent from elsewhere cannot lock the
+    account owner out. Expects the lower-cased email.
+    """
+    return f"loginfail:{email}:{client_ip}"
+
+
+def _issue_access_token(user: User) -> tuple[str, str]:
+    """Create an access token with a unique jti; returns (token, jti)."""
+    jti = generate_secure_token(16)
+    token_data = {
+        "sub": str(user.id),
+        "tenant_id": str(user.tenant_id),
+        "roles": user.roles,
+        "email": user.email,
+        "jti": jti
+    }
+    return create_access_token(token_data), jti
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -87,21 +137,24 @@ async def register_user(
 ):
     """Register a new user and tenant."""
     
-    # Check if email already exists
+    # Check email and tenant name in one round-trip. Emails are only unique
+    # per tenant in the schema, so the global email check cannot be left to
+    # a constraint.
     result = await db.execute(
-        select(User).where(User.email == user_data.email)
+        select(
+            select(User.id).where(User.email == user_data.email).exists().label("email_exists"),
+            select(Tenant.id).where(Tenant.name == user_data.tenant_name).exists().label("tenant_exists")
+        )
     )
-    if result.scalar_one_or_none():
+    existing = result.one()
+    
+    if existing.email_exists:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this email already exists"
         )
     
-    # Check if tenant name already exists
-    result = await db.execute(
-        select(Tenant).where(Tenant.name == user_data.tenant_name)
-    )
-    if result.scalar_one_or_none():
+    if existing.tenant_exists:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Tenant name already exists"
@@ -118,37 +171,83 @@ async def register_user(
     # Create user
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await asyncio.to_thread(get_password_hash, user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         tenant_id=tenant.id,
         roles=["admin"]  # First user in tenant is admin
     )
     db.add(user)
-    await db.commit()
     
-    return UserResponse(**user.to_dict())
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        # A concurrent registration claimed the tenant name after our check
+        await db.rollback()
+        if "tenants_name_key" in str(e.orig):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Tenant name already exists"
+            )
+        raise
+    
+    return UserResponse.model_validate(user)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login_user(
     login_data: LoginRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db_session)
 ):
     """Authenticate user and return tokens."""
     
+    # Throttle per (email, ip) before any database or hashing work. Keys use
+    # the lower-cased email so case variants share one budget.
+    email_key = login_data.email.lower()
+    client_ip = request.client.host if request.client else "unknown"
+    if not await take_token(
+        f"login:{email_key}:{client_ip}",
+        settings.LOGIN_ATTEMPTS_PER_MINUTE,
+        60
+    ):
+        raise RateLimitExceededError(settings.LOGIN_ATTEMPTS_PER_MINUTE, "minute")
+    
+    # After repeated failures from this source, reject without paying for
+    # the KDF. The delay approximates a real hash so the response time does
+    # not reveal it.
+    failures_key = _login_failures_key(email_key, client_ip)
+    failures = await cache_get(failures_key)
+    if failures is not None and int(failures) >= settings.LOGIN_FAILURE_THRESHOLD:
+        await asyncio.sleep(random.uniform(0.08, 0.12))
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
     # Find user by email
-    result = await db.execute(
-        select(User).where(User.email == login_data.email)
-    )
-    user = result.scalar_one_or_none()
+    user = await db.scalar(select(User).where(User.email == login_data.email))
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    # Password hashing is CPU-bound; keep it off the event loop
+    verified, new_hash = await asyncio.to_thread(
+        verify_and_update_password, login_data.password, user.hashed_password
+    )
+    if not verified:
+        await cache_incr(failures_key, settings.LOGIN_FAILURE_WINDOW)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    if failures is not None:
+        await cache_delete(failures_key)
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -156,30 +255,29 @@ async def login_user(
         )
     
     # Create tokens
-    token_data = {
-        "sub": str(user.id),
-        "tenant_id": str(user.tenant_id),
-        "roles": user.roles,
-        "email": user.email
-    }
-    
-    access_token = create_access_token(token_data)
+    access_token, jti = _issue_access_token(user)
     refresh_token = create_refresh_token({"sub": str(user.id)})
     
     # Store refresh token session
+    now = datetime.now(timezone.utc)
     session = UserSession(
         user_id=user.id,
         refresh_token_hash=hash_refresh_token(refresh_token),
         device_info={},
-        expires_at=datetime.utcnow() + timedelta(days=30)
+        expires_at=now + timedelta(days=30)
     )
     db.add(session)
     
-    # Update last login
-    user.last_login = datetime.utcnow()
+    # Update last login, upgrading legacy bcrypt hashes to argon2id
+    user.last_login = now
+    if new_hash:
+        user.hashed_password = new_hash
     
     await db.commit()
     
+    # Warm /me so the first profile fetch skips the database
+    await _cache_user_session(jti, user, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    
     return TokenResponse(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -205,15 +303,15 @@ async def refresh_access_token(
         )
     
     # Check if refresh token session exists and is valid
+    now = datetime.now(timezone.utc)
     token_hash = hash_refresh_token(refresh_data.refresh_token)
-    result = await db.execute(
+    session = await db.scalar(
         select(UserSession).where(
             UserSession.refresh_token_hash == token_hash,
             UserSession.is_active == True,
-            UserSession.expires_at > datetime.utcnow()
+            UserSession.expires_at > now
         )
     )
-    session = result.scalar_one_or_none()
     
     if not session:
         raise HTTPException(
@@ -222,10 +320,9 @@ async def refresh_access_token(
         )
     
     # Get user data
-    result = await db.execute(
+    user = await db.scalar(
         select(User).where(User.id == user_id, User.is_active == True)
     )
-    user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(
@@ -234,19 +331,14 @@ async def refresh_access_token(
         )
     
     # Create new access token
-    token_data = {
-        "sub": str(user.id),
-        "tenant_id": str(user.tenant_id),
-        "roles": user.roles,
-        "email": user.email
-    }
-    
-    access_token = create_access_token(token_data)
+    access_token, jti = _issue_access_token(user)
     
     # Update session last used
-    session.last_used_at = datetime.utcnow()
+    session.last_used_at = now
     await db.commit()
     
+    await _cache_user_session(jti, user, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    
     return TokenResponse(
         access_token=access_token,
         refresh_token=refresh_data.refresh_token,  # Return same refresh token
@@ -261,25 +353,26 @@ async def logout_user(
 ):
     """Logout user and blacklist token."""
     
-    # Blacklist the access token
-    blacklist_token(credentials.credentials)
-    
-    # Get user from token
+    # Get user from token; must happen before blacklisting or it is rejected
     payload = verify_token(credentials.credentials, "access")
     user_id = payload.get("sub")
     
+    # Blacklist the access token and drop its cached session
+    blacklist_token(credentials.credentials)
+    if payload.get("jti"):
+        await cache_delete(_session_cache_key(payload["jti"]))
+    
     if user_id:
-        # Invalidate all refresh token sessions for this user
-        result = await db.execute(
-            select(UserSession).where(
+        # Invalidate all refresh token sessions for this user in one statement
+        await db.execute(
+            update(UserSession)
+            .where(
                 UserSession.user_id == user_id,
-                UserSession.is_active == True
+                UserSession.is_active.is_(True)
             )
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
         )
-        sessions = result.scalars().all()
-        
-        for session in sessions:
-            session.is_active = False
         
         await db.commit()
 
@@ -289,15 +382,24 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Get current user information."""
+    """Get current user information.
+    
+    Served from the per-token session cache when possible; the database is
+    only consulted on a cold cache, which is then backfilled.
+    """
     
     payload = verify_token(credentials.credentials, "access")
     user_id = payload.get("sub")
+    jti = payload.get("jti")
     
-    result = await db.execute(
+    if jti:
+        cached = await cache_get(_session_cache_key(jti))
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    user = await db.scalar(
         select(User).where(User.id == user_id, User.is_active == True)
     )
-    user = result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(
@@ -305,4 +407,10 @@ async def get_current_user(
             detail="User not found"
         )
     
-    return UserResponse(**user.to_dict())
\ No newline at end of file
+    if jti:
+        ttl = int(payload["exp"] - time.time())
+        body = await _cache_user_session(jti, user, ttl)
+    else:
+        body = _user_response_json(user)
+    
+    return Response(content=body, media_type="application/json")
\ No newline at end of file
@@ -5,67 +5,124 @@ Job management and monitoring for processing tasks.
 """
 
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from pydantic import BaseModel, validator
+from sqlalchemy import select, update, and_, or_, func, tuple_, exists, case, literal
+from pydantic import BaseModel, ConfigDict, validator
+import asyncio
 import uuid
 from datetime import datetime
 
+from app.api.v1.endpoints.projects import project_cache_namespace
+from app.core.cache import cache_invalidate
 from app.core.database import get_db_session
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse, dumps_json
 from app.core.security import get_current_user_token
+from app.models.audit_log import AuditLog
 from app.models.job import Job
 from app.models.project import Project
-from app.workers.celery_app import celery_app
+from app.models.scene import Scene
+from app.workers.celery_app import celery_app, get_task_states
 from app.core.exceptions import ValidationException, PermissionException
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched per round-trip while streaming logs
+JOB_LOG_STREAM_BATCH = 100
+
+ALLOWED_ACTIONS = frozenset({
+    'approve_scenes', 'reject_scenes', 'retry', 'cancel',
+    'continue_processing', 'adjust_settings'
+})
+
+# Worker tasks are sent by name so the API process never imports the worker
+# modules and their media/ML dependencies
+ASSEMBLE_VIDEO_TASK = "app.workers.assembly.assemble_video"
+
+# Job type -> (task name, arguments after the job id)
+PROCESSING_TASKS = {
+    "preprocess": ("app.workers.preprocessing.preprocess_video", ("", "")),
+    "transcription": ("app.workers.transcription.transcribe_audio", ("", "")),
+    "alignment": ("app.workers.alignment.align_script_to_video", ()),
+    "assembly": (ASSEMBLE_VIDEO_TASK, ()),
+}
+
+
+# Progress timings are computed against the database clock in the job query
+_job_runtime = func.now() - Job.started_at
+_job_percent = Job.progress["percent"].as_float()
+JOB_RUNTIME_SECONDS = func.extract("epoch", _job_runtime).label("runtime_seconds")
+# Linear extrapolation from the share of work done so far
+JOB_ESTIMATED_COMPLETION = case(
+    (
+        and_(_job_percent > 0, Job.estimated_duration.is_not(None)),
+        func.now() + _job_runtime * (literal(100.0) / _job_percent - 1)
+    ),
+    else_=None
+).label("estimated_completion")
 
 
 # Pydantic models
+
+
 class JobAction(BaseModel):
     action: str
     payload: Optional[Dict[str, Any]] = {}
     
     @validator('action')
     def validate_action(cls, v):
-        allowed_actions = [
-            'approve_scenes', 'reject_scenes', 'retry', 'cancel', 
-            'continue_processing', 'adjust_settings'
-        ]
-        if v not in allowed_actions:
-            raise ValueError(f'action must be one of: {", ".join(allowed_actions)}')
+        if v not in ALLOWED_ACTIONS:
+            raise ValueError(f'action must be one of: {", ".join(sorted(ALLOWED_ACTIONS))}')
         return v
 
 
-class JobResponse(BaseModel):
-    id: str
-    project_id: str
+class JobListItem(BaseModel):
+    """Job as shown in list pages, without the config and asset id arrays."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
+    project_id: uuid.UUID
     type: str
     status: str
     priority: int
     progress: Dict[str, Any]
-    config: Dict[str, Any]
-    input_assets: List[str]
-    output_assets: List[str]
     error_message: Optional[str]
     retry_count: int
     max_retries: int
     estimated_duration: Optional[int]
-    started_at: Optional[str]
-    completed_at: Optional[str]
-    created_at: str
-    updated_at: str
-    
-    class Config:
-        from_attributes = True
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobResponse(JobListItem):
+    config: Dict[str, Any]
+    input_assets: List[uuid.UUID]
+    output_assets: List[uuid.UUID]
 
 
 class JobListResponse(BaseModel):
-    items: List[JobResponse]
-    total: int
+    items: List[JobListItem]
+    total: Optional[int]  # Not counted on cursor pages
     limit: int
     offset: int
+    next_cursor: Optional[str]
+
+
+# List pages select only the JobListItem columns, skipping the config and
+# asset JSONB/array payloads, and render the row mappings with orjson, which
+# handles the UUID and datetime values natively
+JOB_LIST_COLUMNS = tuple(getattr(Job, field) for field in JobListItem.model_fields)
+
+
+def _job_response(job: Job) -> ORJSONResponse:
+    """Validate a job once from its attributes and render it with orjson."""
+    return ORJSONResponse(JobResponse.model_validate(job).model_dump())
 
 
 class JobProgressUpdate(BaseModel):
@@ -75,87 +132,106 @@ class JobProgressUpdate(BaseModel):
     estimated_completion: Optional[datetime] = None
 
 
+def _owned_job_filter(current_user: dict):
+    """EXISTS clause restricting jobs to projects the user owns.
+    
+    A semi-join on the project's primary key; unlike joining projects in,
+    no project row is carried along with each job.
+    """
+    return exists().where(
+        Project.id == Job.project_id,
+        Project.user_id == current_user["user_id"],
+        Project.tenant_id == current_user["tenant_id"]
+    )
+
+
+def _job_list_filters(
+    current_user: dict,
+    status_filter: Optional[str],
+    job_type: Optional[str],
+    project_id: Optional[uuid.UUID]
+) -> list:
+    """WHERE clauses shared by the job list page and its count."""
+    
+    # Only jobs for user's projects
+    filters = [
+        Project.user_id == current_user["user_id"],
+        Project.tenant_id == current_user["tenant_id"]
+    ]
+    
+    if status_filter:
+        filters.append(Job.status == status_filter)
+    
+    if job_type:
+        filters.append(Job.type == job_type)
+    
+    if project_id:
+        filters.append(Job.project_id == project_id)
+    
+    return filters
+
+
 @router.get("", response_model=JobListResponse)
 async def list_jobs(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     job_type: Optional[str] = Query(None, alias="type"),
-    project_id: Optional[str] = Query(None),
+    project_id: Optional[uuid.UUID] = Query(None),
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """List user's jobs with filtering and pagination."""
-    
-    # Base query - only jobs for user's projects
-    query = select(Job).join(Project).where(
-        and_(
-            Project.user_id == current_user["user_id"],
-            Project.tenant_id == current_user["tenant_id"]
+    """List user's jobs with filtering and pagination.
+    
+    Pass the returned next_cursor to fetch the following page; cursor pages
+    skip the total count and ignore offset.
+    """
+    
+    filters = _job_list_filters(current_user, status, job_type, project_id)
+    query = select(*JOB_LIST_COLUMNS).join(Project).where(*filters)
+    
+    total = None
+    if cursor:
+        # Keyset pagination: constant cost however deep the page is
+        query = query.where(tuple_(Job.created_at, Job.id) < decode_cursor(cursor))
+    else:
+        # Count directly over the same filters rather than wrapping the page
+        # query in a derived table
+        total = await db.scalar(
+            select(func.count(Job.id)).select_from(Job).join(Project).where(*filters)
         )
-    )
-    
-    # Apply filters
-    if status:
-        query = query.where(Job.status == status)
-    
-    if job_type:
-        query = query.where(Job.type == job_type)
-    
-    if project_id:
-        try:
-            project_uuid = uuid.UUID(project_id)
-            query = query.where(Job.project_id == project_uuid)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid project ID format"
-            )
-    
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        query = query.offset(offset)
     
-    # Apply pagination and ordering
-    query = query.order_by(Job.created_at.desc()).offset(offset).limit(limit)
+    query = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit)
     
     result = await db.execute(query)
-    jobs = result.scalars().all()
+    items = [dict(row) for row in result.mappings()]
     
-    return JobListResponse(
-        items=[JobResponse.from_orm(job) for job in jobs],
-        total=total,
-        limit=limit,
-        offset=offset
-    )
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+    
+    return ORJSONResponse({
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
-    job_id: str,
+    job_id: uuid.UUID,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get job details by ID."""
     
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID format"
-        )
-    
     # Query job with project access check
     result = await db.execute(
-        select(Job).join(Project).where(
-            and_(
-                Job.id == job_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
+        select(Job).where(Job.id == job_id, _owned_job_filter(current_user))
     )
     
     job = result.scalar_one_or_none()
@@ -166,40 +242,38 @@ async def get_job(
             detail="Job not found"
         )
     
-    return JobResponse.from_orm(job)
+    return _job_response(job)
 
 
 @router.post("/{job_id}/actions", response_model=JobResponse)
 async def perform_job_action(
-    job_id: str,
+    job_id: uuid.UUID,
     action: JobAction,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Perform manual actions on jobs."""
     
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID format"
-        )
-    
-    # Get job with access check
+    # Get job with access check, locking it until commit so concurrent
+    # actions on the same job cannot both apply
     result = await db.execute(
-        select(Job).join(Project).where(
-            and_(
-                Job.id == job_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
+        select(Job)
+        .where(Job.id == job_id, _owned_job_filter(current_user))
+        .with_for_update(skip_locked=True)
     )
     
     job = result.scalar_one_or_none()
     
     if not job:
+        # Only a miss pays for a second query to tell 404 from 409
+        is_locked = await db.scalar(
+            select(exists().where(Job.id == job_id, _owned_job_filter(current_user)))
+        )
+        if is_locked:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another action is already in progress for this job"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
@@ -225,10 +299,12 @@ async def perform_job_action(
         elif action.action == "adjust_settings":
             await handle_adjust_settings(job, action.payload, db)
         
+        # updated_at comes back via RETURNING (eager_defaults on Job)
         await db.commit()
-        await db.refresh(job)
+        # Job status counts feed the cached project stats
+        await cache_invalidate(project_cache_namespace(current_user))
         
-        return JobResponse.from_orm(job)
+        return _job_response(job)
         
     except Exception as e:
         await db.rollback()
@@ -240,50 +316,37 @@ async def perform_job_action(
 
 @router.get("/{job_id}/progress")
 async def get_job_progress(
-    job_id: str,
+    job_id: uuid.UUID,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get detailed job progress information."""
     
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID format"
-        )
-    
-    # Get job
+    # Get job with its runtime and estimated completion
     result = await db.execute(
-        select(Job).join(Project).where(
-            and_(
-                Job.id == job_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
+        select(Job, JOB_RUNTIME_SECONDS, JOB_ESTIMATED_COMPLETION)
+        .where(Job.id == job_id, _owned_job_filter(current_user))
     )
     
-    job = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not job:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
+    job, runtime_seconds, estimated_completion = row
+    
     # Get real-time progress from Celery if job is running
     celery_progress = None
     if job.status in ["pending", "running"]:
         try:
-            # Get Celery task info
-            task_result = celery_app.AsyncResult(str(job.id))
-            if task_result.state in ["PENDING", "PROGRESS"]:
-                celery_progress = {
-                    "state": task_result.state,
-                    "info": task_result.info
-                }
+            # Read Celery task meta without blocking the event loop
+            task_id = str(job.id)
+            task_state = (await get_task_states([task_id]))[task_id]
+            if task_state["state"] in ["PENDING", "PROGRESS"]:
+                celery_progress = task_state
         except Exception:
             # Celery task not found or error - use DB progress
             pass
@@ -293,23 +356,14 @@ async def get_job_progress(
         "status": job.status,
         "progress": job.progress,
         "started_at": job.started_at.isoformat() if job.started_at else None,
-        "estimated_completion": None,
-        "runtime_seconds": None
+        "estimated_completion": (
+            estimated_completion.isoformat() if estimated_completion else None
+        ),
+        "runtime_seconds": (
+            float(runtime_seconds) if runtime_seconds is not None else None
+        )
     }
     
-    # Calculate runtime and estimated completion
-    if job.started_at:
-        runtime = datetime.utcnow() - job.started_at
-        progress_data["runtime_seconds"] = runtime.total_seconds()
-        
-        # Estimate completion based on current progress
-        percent = job.progress.get("percent", 0)
-        if percent > 0 and job.estimated_duration:
-            estimated_total = (runtime.total_seconds() / percent) * 100
-            estimated_remaining = estimated_total - runtime.total_seconds()
-            estimated_completion = datetime.utcnow() + timedelta(seconds=estimated_remaining)
-            progress_data["estimated_completion"] = estimated_completion.isoformat()
-    
     # Include Celery real-time data if available
     if celery_progress:
         progress_data["celery_state"] = celery_progress
@@ -319,32 +373,23 @@ async def get_job_progress(
 
 @router.get("/{job_id}/logs")
 async def get_job_logs(
-    job_id: str,
+    request: Request,
+    job_id: uuid.UUID,
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     level: Optional[str] = Query(None),
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Get job execution logs."""
+    """Get job execution logs.
     
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID format"
-        )
+    Clients sending ``Accept: application/x-ndjson`` get one JSON line per log
+    entry, written as rows arrive from the database.
+    """
     
     # Verify job access
     result = await db.execute(
-        select(Job).join(Project).where(
-            and_(
-                Job.id == job_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
+        select(Job).where(Job.id == job_id, _owned_job_filter(current_user))
     )
     
     job = result.scalar_one_or_none()
@@ -356,10 +401,15 @@ async def get_job_logs(
         )
     
     # Get logs from audit_logs table
-    from app.models.audit_log import AuditLog
-    
-    query = select(AuditLog).where(
-        AuditLog.resource_id == job_uuid
+    # Only the response columns; rows come back as mappings, not ORM objects
+    query = select(
+        AuditLog.id,
+        AuditLog.level,
+        AuditLog.message,
+        AuditLog.created_at.label("timestamp"),
+        AuditLog.details
+    ).where(
+        AuditLog.resource_id == job_id
     )
     
     if level:
@@ -367,24 +417,26 @@ async def get_job_logs(
     
     query = query.order_by(AuditLog.created_at.desc()).offset(offset).limit(limit)
     
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_job_logs_ndjson(db, query), media_type=NDJSON_MEDIA_TYPE
+        )
+    
     logs_result = await db.execute(query)
-    logs = logs_result.scalars().all()
-    
-    return {
-        "job_id": str(job_uuid),
-        "logs": [
-            {
-                "id": str(log.id),
-                "level": log.level,
-                "message": log.message,
-                "timestamp": log.created_at.isoformat(),
-                "details": log.details
-            }
-            for log in logs
-        ],
+    
+    return ORJSONResponse({
+        "job_id": job_id,
+        "logs": [dict(log) for log in logs_result.mappings()],
         "limit": limit,
         "offset": offset
-    }
+    })
+
+
+async def _stream_job_logs_ndjson(db: AsyncSession, query):
+    """Yield one JSON line per log entry while rows are still arriving."""
+    result = await db.stream(query.execution_options(yield_per=JOB_LOG_STREAM_BATCH))
+    async for row in result.mappings():
+        yield dumps_json(dict(row)) + b"\n"
 
 
 # Action handlers
@@ -406,36 +458,37 @@ async def handle_approve_scenes(job: Job, payload: Dict[str, Any], db: AsyncSess
         )
     
     # Update scenes as approved
-    from app.models.scene import Scene
-    
-    await db.execute(
-        update(Scene).where(
+    approved = (
+        update(Scene)
+        .where(
             and_(
                 Scene.job_id == job.id,
                 Scene.id.in_(scene_ids)
             )
-        ).values(user_approved=True, manual_review_required=False)
+        )
+        .values(user_approved=True, manual_review_required=False)
+        .returning(Scene.id)
+        .cte("approved")
     )
     
-    # Check if all scenes are approved
-    remaining_result = await db.execute(
-        select(func.count()).where(
+    # Count what is still awaiting review in the same statement. The outer
+    # query sees the pre-update snapshot, so exclude the rows just approved.
+    remaining_count = await db.scalar(
+        select(func.count(Scene.id)).where(
             and_(
                 Scene.job_id == job.id,
-                Scene.manual_review_required == True
+                Scene.manual_review_required == True,
+                Scene.id.not_in(select(approved.c.id))
             )
         )
     )
     
-    remaining_count = remaining_result.scalar()
-    
     if remaining_count == 0:
         # All scenes approved, continue processing
         job.status = "pending"
         
         # Queue next processing step
-        from app.workers.assembly import assemble_video
-        assemble_video.delay(str(job.id))
+        celery_app.send_task(ASSEMBLE_VIDEO_TASK, args=(str(job.id),))
 
 
 async def handle_reject_scenes(job: Job, payload: Dict[str, Any], db: AsyncSession):
@@ -457,8 +510,6 @@ async def handle_reject_scenes(job: Job, payload: Dict[str, Any], db: AsyncSessi
         )
     
     # Mark scenes as rejected
-    from app.models.scene import Scene
-    
     await db.execute(
         update(Scene).where(
             and_(
@@ -511,7 +562,10 @@ async def handle_cancel_job(job: Job, db: AsyncSession):
     # Cancel Celery task if running
     if job.status in ["pending", "running"]:
         try:
-            celery_app.control.revoke(str(job.id), terminate=True)
+            # Revoking is a broker round-trip; keep it off the event loop
+            await asyncio.to_thread(
+                celery_app.control.revoke, str(job.id), terminate=True, signal="SIGTERM"
+            )
         except Exception:
             pass
     
@@ -525,9 +579,9 @@ async def handle_continue_processing(job: Job, payload: Dict[str, Any], db: Asyn
     upscaled_video_path = payload.get("upscaled_video_path")
     
     if upscaled_video_path:
-        # Update job config with upscaled video path
-        job.config = job.config or {}
-        job.config["upscaled_video_path"] = upscaled_video_path
+        # Update job config with upscaled video path. Assign a new dict:
+        # in-place changes to the plain JSONB column are not tracked
+        job.config = {**(job.config or {}), "upscaled_video_path": upscaled_video_path}
     
     # Continue with next step
     job.status = "pending"
@@ -541,26 +595,14 @@ async def handle_adjust_settings(job: Job, payload: Dict[str, Any], db: AsyncSes
     
     settings = payload.get("settings", {})
     
-    # Update job configuration
-    job.config = job.config or {}
-    job.config.update(settings)
+    # Update job configuration with a new dict so the change is flushed
+    job.config = {**(job.config or {}), **settings}
 
 
 def queue_job_for_processing(job: Job):
     """Queue job for appropriate processing step."""
     
-    if job.type == "preprocess":
-        from app.workers.preprocessing import preprocess_video
-        preprocess_video.delay(str(job.id), "", "")
-        
-    elif job.type == "transcription":
-        from app.workers.transcription import transcribe_audio
-        transcribe_audio.delay(str(job.id), "", "")
-        
-    elif job.type == "alignment":
-        from app.workers.alignment import align_script_to_video
-        align_script_to_video.delay(str(job.id))
-        
-    elif job.type == "assembly":
-        from app.workers.assembly import assemble_video
-        assemble_video.delay(str(job.id))
\ No newline at end of file
+    task = PROCESSING_TASKS.get(job.type)
+    if task is not None:
+        task_name, extra_args = task
+        celery_app.send_task(task_name, args=(str(job.id), *extra_args))
\ No newline at end of file
@@ -5,19 +5,82 @@ Project management functionality for organizing user uploads and processing jobs
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from pydantic import BaseModel, validator
+from sqlalchemy import select, and_, func, tuple_, bindparam, literal_column, exists
+from sqlalchemy.dialects.postgresql import JSON
+from pydantic import BaseModel, ConfigDict, validator
 import uuid
+from datetime import datetime
 
+from app.core.cache import cache_key, cache_get, cache_set, cache_delete, cache_invalidate, coalesce
 from app.core.database import get_db_session
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import ORJSONResponse, dumps_json
 from app.core.security import get_current_user_token
+from app.models.asset import Asset, storage_used_key
+from app.models.job import Job
 from app.models.project import Project
 from app.models.user import User
 from app.core.exceptions import ValidationException, PermissionException
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Dashboards poll the first project page and project stats every few
+# seconds; both are cached per user and dropped on that user's writes
+PROJECT_CACHE_NAMESPACE = "projects"
+PROJECT_CACHE_TTL = 30
+
+# Job statuses that block deleting their project
+ACTIVE_JOB_STATUSES = ("pending", "running", "manual_review")
+
+
+def project_cache_namespace(current_user: dict) -> str:
+    """Cache namespace holding one user's cached project reads."""
+    return f'{PROJECT_CACHE_NAMESPACE}:{current_user["tenant_id"]}:{current_user["user_id"]}'
+
+
+# Project stats in one round-trip: the ownership check and both per-type
+# aggregates come back as a single row, or no row if the user can't see it
+_asset_groups = select(
+    Asset.type,
+    func.count(Asset.id).label("count"),
+    func.coalesce(func.sum(Asset.size_bytes), 0).label("total_size_bytes")
+).where(Asset.project_id == bindparam("project_id")).group_by(Asset.type).subquery()
+
+_job_groups = select(
+    Job.status,
+    func.count(Job.id).label("count")
+).where(Job.project_id == bindparam("project_id")).group_by(Job.status).subquery()
+
+_PROJECT_STATS_STMT = select(
+    Project.created_at,
+    Project.updated_at,
+    select(
+        func.coalesce(
+            func.json_object_agg(
+                _asset_groups.c.type,
+                func.json_build_object(
+                    literal_column("'count'"), _asset_groups.c.count,
+                    literal_column("'total_size_bytes'"), _asset_groups.c.total_size_bytes
+                )
+            ),
+            literal_column("'{}'::json"),
+            type_=JSON
+        )
+    ).scalar_subquery().label("assets"),
+    select(
+        func.coalesce(
+            func.json_object_agg(func.coalesce(_job_groups.c.status, "null"), _job_groups.c.count),
+            literal_column("'{}'::json"),
+            type_=JSON
+        )
+    ).scalar_subquery().label("jobs")
+).where(
+    Project.id == bindparam("project_id"),
+    Project.user_id == bindparam("user_id"),
+    Project.tenant_id == bindparam("tenant_id")
+)
 
 
 # Pydantic models
@@ -52,74 +115,122 @@ class ProjectUpdate(BaseModel):
 
 
 class ProjectResponse(BaseModel):
-    id: str
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
     title: str
     description: Optional[str]
     settings: dict
     status: str
-    user_id: str
-    tenant_id: str
-    created_at: str
-    updated_at: str
-    
-    class Config:
-        from_attributes = True
+    user_id: uuid.UUID
+    tenant_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
 
 
 class ProjectListResponse(BaseModel):
     items: List[ProjectResponse]
-    total: int
+    total: Optional[int]  # Not counted on cursor pages
     limit: int
     offset: int
+    next_cursor: Optional[str]
 
 
-@router.get("", response_model=ProjectListResponse)
-async def list_projects(
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    status: Optional[str] = Query(None),
-    search: Optional[str] = Query(None),
-    current_user: dict = Depends(get_current_user_token),
-    db: AsyncSession = Depends(get_db_session)
-):
-    """List user's projects with pagination and filtering."""
-    
-    # Build query
-    query = select(Project).where(
-        and_(
-            Project.user_id == current_user["user_id"],
-            Project.tenant_id == current_user["tenant_id"]
-        )
+# List pages select the ProjectResponse columns and render the row mappings
+# with orjson, which handles the UUID and datetime values natively; no ORM
+# instances or pydantic models are built per row
+PROJECT_LIST_COLUMNS = tuple(getattr(Project, field) for field in ProjectResponse.model_fields)
+
+
+def _project_response(project: Project, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """Validate a project once from its attributes and render it with orjson."""
+    return ORJSONResponse(
+        ProjectResponse.model_validate(project).model_dump(), status_code=status_code
     )
+
+
+def _project_list_filters(
+    current_user: dict,
+    status_filter: Optional[str],
+    search: Optional[str]
+) -> list:
+    """WHERE clauses shared by the project list page and its count."""
     
-    # Add filters
-    if status:
-        query = query.where(Project.status == status)
+    filters = [
+        Project.user_id == current_user["user_id"],
+        Project.tenant_id == current_user["tenant_id"]
+    ]
+    
+    if status_filter:
+        filters.append(Project.status == status_filter)
     
     if search:
+        # Served by the idx_projects_search_trgm GIN index
         search_term = f"%{search}%"
-        query = query.where(
+        filters.append(
             Project.title.ilike(search_term) | 
             Project.description.ilike(search_term)
         )
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination and ordering
-    query = query.order_by(Project.created_at.desc()).offset(offset).limit(limit)
+    return filters
+
+
+@router.get("", response_model=ProjectListResponse)
+async def list_projects(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user_token),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """List user's projects with pagination and filtering.
+    
+    Pass the returned next_cursor to fetch the following page; cursor pages
+    skip the total count and ignore offset.
+    """
+    
+    # Only the first page is cached; deeper pages are rarely re-read
+    key = None
+    if not cursor and not offset:
+        key = await cache_key(project_cache_namespace(current_user), "list", limit, status, search)
+        cached = await cache_get(key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    filters = _project_list_filters(current_user, status, search)
+    query = select(*PROJECT_LIST_COLUMNS).where(*filters)
+    
+    total = None
+    if cursor:
+        # Keyset pagination: constant cost however deep the page is
+        query = query.where(tuple_(Project.created_at, Project.id) < decode_cursor(cursor))
+    else:
+        # Count directly over the same filters rather than wrapping the page
+        # query in a derived table
+        total = await db.scalar(select(func.count(Project.id)).where(*filters))
+        query = query.offset(offset)
+    
+    query = query.order_by(Project.created_at.desc(), Project.id.desc()).limit(limit)
     
     result = await db.execute(query)
-    projects = result.scalars().all()
-    
-    return ProjectListResponse(
-        items=[ProjectResponse.from_orm(project) for project in projects],
-        total=total,
-        limit=limit,
-        offset=offset
-    )
+    items = [dict(row) for row in result.mappings()]
+    
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = encode_cursor(items[-1]["created_at"], items[-1]["id"])
+    
+    response = ORJSONResponse({
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
+    if key is not None:
+        await cache_set(key, response.body, PROJECT_CACHE_TTL)
+    return response
 
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
@@ -143,8 +254,9 @@ async def create_project(
         db.add(project)
         await db.commit()
         await db.refresh(project)
+        await cache_invalidate(project_cache_namespace(current_user))
         
-        return ProjectResponse.from_orm(project)
+        return _project_response(project, status.HTTP_201_CREATED)
         
     except Exception as e:
         await db.rollback()
@@ -156,25 +268,17 @@ async def create_project(
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
-    project_id: str,
+    project_id: uuid.UUID,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get project by ID."""
     
-    try:
-        project_uuid = uuid.UUID(project_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid project ID format"
-        )
-    
     # Query project with user/tenant check
     result = await db.execute(
         select(Project).where(
             and_(
-                Project.id == project_uuid,
+                Project.id == project_id,
                 Project.user_id == current_user["user_id"],
                 Project.tenant_id == current_user["tenant_id"]
             )
@@ -189,31 +293,23 @@ async def get_project(
             detail="Project not found"
         )
     
-    return ProjectResponse.from_orm(project)
+    return _project_response(project)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
-    project_id: str,
+    project_id: uuid.UUID,
     project_data: ProjectUpdate,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Update project."""
     
-    try:
-        project_uuid = uuid.UUID(project_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid project ID format"
-        )
-    
     # Get project
     result = await db.execute(
         select(Project).where(
             and_(
-                Project.id == project_uuid,
+                Project.id == project_id,
                 Project.user_id == current_user["user_id"],
                 Project.tenant_id == current_user["tenant_id"]
             )
@@ -237,8 +333,9 @@ async def update_project(
         
         await db.commit()
         await db.refresh(project)
+        await cache_invalidate(project_cache_namespace(current_user))
         
-        return ProjectResponse.from_orm(project)
+        return _project_response(project)
         
     except Exception as e:
         await db.rollback()
@@ -250,25 +347,17 @@ async def update_project(
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
-    project_id: str,
+    project_id: uuid.UUID,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Delete project and all associated data."""
     
-    try:
-        project_uuid = uuid.UUID(project_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid project ID format"
-        )
-    
     # Get project
     result = await db.execute(
         select(Project).where(
             and_(
-                Project.id == project_uuid,
+                Project.id == project_id,
                 Project.user_id == current_user["user_id"],
                 Project.tenant_id == current_user["tenant_id"]
             )
@@ -284,21 +373,15 @@ async def delete_project(
         )
     
     try:
-        # Check if project has active jobs
-        from app.models.job import Job
-        
-        jobs_result = await db.execute(
-            select(Job).where(
-                and_(
-                    Job.project_id == project_uuid,
-                    Job.status.in_(["pending", "running", "manual_review"])
-                )
-            )
+        # Check if project has active jobs; stops at the first match
+        has_active_jobs = await db.scalar(
+            select(exists().where(
+                Job.project_id == project_id,
+                Job.status.in_(ACTIVE_JOB_STATUSES)
+            ))
         )
         
-        active_jobs = jobs_result.scalars().all()
-        
-        if active_jobs:
+        if has_active_jobs:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Cannot delete project with active jobs. Please wait for jobs to complete or cancel them first."
@@ -307,6 +390,9 @@ async def delete_project(
         # Delete project (cascading deletes will handle related data)
         await db.delete(project)
         await db.commit()
+        await cache_invalidate(project_cache_namespace(current_user))
+        # The project's assets were cascaded away; re-sum usage on next upload
+        await cache_delete(storage_used_key(current_user["tenant_id"]))
         
     except HTTPException:
         raise
@@ -320,76 +406,43 @@ async def delete_project(
 
 @router.get("/{project_id}/stats")
 async def get_project_stats(
-    project_id: str,
+    project_id: uuid.UUID,
     current_user: dict = Depends(get_current_user_token),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get project statistics."""
     
-    try:
-        project_uuid = uuid.UUID(project_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid project ID format"
-        )
-    
-    # Verify project exists and user has access
-    result = await db.execute(
-        select(Project).where(
-            and_(
-                Project.id == project_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
+    key = await cache_key(project_cache_namespace(current_user), "stats", project_id)
+    cached = await cache_get(key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    async def render_stats() -> bytes:
+        # Access check and statistics in a single statement
+        result = await db.execute(_PROJECT_STATS_STMT, {
+            "project_id": project_id,
+            "user_id": current_user["user_id"],
+            "tenant_id": current_user["tenant_id"]
+        })
+        stats = result.first()
+        
+        if not stats:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
             )
-        )
-    )
-    
-    project = result.scalar_one_or_none()
-    
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    # Get statistics
-    from app.models.asset import Asset
-    from app.models.job import Job
-    from sqlalchemy import func
-    
-    # Asset stats
-    assets_result = await db.execute(
-        select(
-            Asset.type,
-            func.count(Asset.id).label('count'),
-            func.sum(Asset.size_bytes).label('total_size')
-        ).where(Asset.project_id == project_uuid).group_by(Asset.type)
-    )
-    
-    assets_stats = {}
-    for row in assets_result:
-        assets_stats[row.type] = {
-            'count': row.count,
-            'total_size_bytes': row.total_size or 0
-        }
-    
-    # Job stats
-    jobs_result = await db.execute(
-        select(
-            Job.status,
-            func.count(Job.id).label('count')
-        ).where(Job.project_id == project_uuid).group_by(Job.status)
-    )
-    
-    jobs_stats = {}
-    for row in jobs_result:
-        jobs_stats[row.status] = row.count
-    
-    return {
-        "project_id": str(project_uuid),
-        "assets": assets_stats,
-        "jobs": jobs_stats,
-        "created_at": project.created_at.isoformat(),
-        "last_updated": project.updated_at.isoformat()
-    }
\ No newline at end of file
+        
+        body = dumps_json({
+            "project_id": str(project_id),
+            "assets": stats.assets,
+            "jobs": stats.jobs,
+            "created_at": stats.created_at.isoformat(),
+            "last_updated": stats.updated_at.isoformat()
+        })
+        await cache_set(key, body, PROJECT_CACHE_TTL)
+        return body
+    
+    # Dashboard panels polling the same project share one query on a miss
+    body = await coalesce(key, render_stats)
+    
+    return Response(content=body, media_type="application/json")
\ No newline at end of file
@@ -4,29 +4,116 @@ Uploads API Endpoints
 Handle file uploads with chunked/resumable upload support and Google Drive integration.
 """
 
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from typing import BinaryIO, Optional, List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from pydantic import BaseModel, validator
+from sqlalchemy import select, and_, exists, func
+from pydantic import BaseModel, field_validator
+from celery import group
+from starlette.concurrency import run_in_threadpool
+from contextlib import contextmanager
 import uuid
 import os
-import tempfile
+import re
 import hashlib
 import mimetypes
 from datetime import datetime, timedelta
 
+from app.api.v1.endpoints.projects import project_cache_namespace
+from app.core.cache import cache_get, cache_set, cache_incr_existing, cache_invalidate
 from app.core.database import get_db_session
 from app.core.security import get_current_user_token
 from app.models.project import Project
-from app.models.asset import Asset
+from app.models.asset import Asset, storage_used_key
+from app.models.tenant import Tenant
 from app.core.config import settings
-from app.services.google_drive import GoogleDriveService
-from app.workers.preprocessing import validate_upload
+from app.services.google_drive import GoogleDriveService, get_drive_service
+from app.workers.celery_app import celery_app
 from app.core.exceptions import ValidationException, QuotaExceededException
 
 router = APIRouter()
 
+# Path separators, traversal and characters Windows/Drive reject in names
+_BAD_FILENAME_RE = re.compile(r'\.\.|[/\\<>:"|?*]')
+
+# Upload limits read once from settings instead of on every request
+_MAX_UPLOAD_SIZE = settings.MAX_UPLOAD_SIZE
+_ALLOWED_VIDEO_EXT = frozenset(settings.ALLOWED_VIDEO_EXTENSIONS)
+_ALLOWED_SCRIPT_EXT = frozenset(settings.ALLOWED_SCRIPT_EXTENSIONS)
+
+# Sent by name so the API process does not import the worker's media stack
+VALIDATE_UPLOAD_TASK = "app.workers.preprocessing.validate_upload"
+PREPROCESS_VIDEO_TASK = "app.workers.preprocessing.preprocess_video"
+
+# Size limit for direct upload
+MAX_DIRECT_UPLOAD = 100 * 1024 * 1024  # 100MB
+
+# Room for the multipart boundaries and form fields around the file
+DIRECT_UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+# Direct uploads are read and hashed this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Cached tenant storage usage is re-summed from the database at least this
+# often, bounding drift from deletes that bypass the API
+STORAGE_USED_TTL = 300
+
+# Read buffers are recycled between uploads; at most this many are kept idle
+UPLOAD_BUFFER_POOL_MAX = 16
+_upload_buffers: List[bytearray] = []
+
+
+@contextmanager
+def _upload_buffer():
+    """Borrow a chunk-sized read buffer, returning it to the pool afterwards."""
+    # pop() is atomic; checking for emptiness first would race other threads
+    try:
+        buf = _upload_buffers.pop()
+    except IndexError:
+        buf = bytearray(UPLOAD_CHUNK_SIZE)
+    try:
+        with memoryview(buf) as view:
+            yield view
+    finally:
+        if len(_upload_buffers) < UPLOAD_BUFFER_POOL_MAX:
+            _upload_buffers.append(buf)
+
+
+def _hash_file(fileobj: BinaryIO) -> Tuple[str, int]:
+    """SHA-256 hex digest and byte count of a file, read through a pooled buffer.
+    
+    Blocking; run it in the threadpool. hashlib releases the GIL on large
+    chunks, so hashing proceeds alongside the event loop.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    with _upload_buffer() as view:
+        while n := fileobj.readinto(view):
+            hasher.update(view[:n])
+            size += n
+    return hasher.hexdigest(), size
+
+
+def _project_access_filter(project_uuid: uuid.UUID, current_user: dict):
+    """Match the project only if it belongs to the current user."""
+    return and_(
+        Project.id == project_uuid,
+        Project.user_id == current_user["user_id"],
+        Project.tenant_id == current_user["tenant_id"]
+    )
+
+
+async def _verify_project_access(project_uuid: uuid.UUID, current_user: dict, db: AsyncSession):
+    """Raise 404 unless the project exists and belongs to the current user."""
+    project_id = await db.scalar(
+        select(Project.id).where(_project_access_filter(project_uuid, current_user))
+    )
+    if project_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
 
 # Pydantic models
 class UploadInitRequest(BaseModel):
@@ -36,28 +123,30 @@ class UploadInitRequest(BaseModel):
     file_size: int
     content_type: Optional[str] = None
     
-    @validator('file_type')
+    @field_validator('file_type')
+    @classmethod
     def validate_file_type(cls, v):
         if v not in ['video', 'script']:
             raise ValueError('file_type must be "video" or "script"')
         return v
     
-    @validator('file_size')
+    @field_validator('file_size')
+    @classmethod
     def validate_file_size(cls, v):
         if v <= 0:
             raise ValueError('file_size must be positive')
-        if v > settings.MAX_UPLOAD_SIZE:
-            raise ValueError(f'file_size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes')
+        if v > _MAX_UPLOAD_SIZE:
+            raise ValueError(f'file_size exceeds maximum allowed size of {_MAX_UPLOAD_SIZE} bytes')
         return v
     
-    @validator('filename')
+    @field_validator('filename')
+    @classmethod
     def validate_filename(cls, v):
         if not v or len(v.strip()) == 0:
             raise ValueError('filename cannot be empty')
         
         # Check for dangerous characters
-        dangerous_chars = ['..', '/', '\\', '<', '>', ':', '"', '|', '?', '*']
-        if any(char in v for char in dangerous_chars):
+        if _BAD_FILENAME_RE.search(v):
             raise ValueError('filename contains invalid characters')
         
         return v.strip()
@@ -93,10 +182,14 @@ class AssetResponse(BaseModel):
 async def initialize_upload(
     upload_request: UploadInitRequest,
     current_user: dict = Depends(get_current_user_token),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    drive_service: GoogleDriveService = Depends(get_drive_service)
 ):
     """Initialize a resumable upload session."""
     
+    user_id = current_user["user_id"]
+    tenant_id = current_user["tenant_id"]
+    
     try:
         project_uuid = uuid.UUID(upload_request.project_id)
     except ValueError:
@@ -105,42 +198,25 @@ async def initialize_upload(
             detail="Invalid project ID format"
         )
     
-    # Verify project exists and user has access
-    result = await db.execute(
-        select(Project).where(
-            and_(
-                Project.id == project_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
-    )
-    
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    # Check quota
+    # Verify project access and check quota in one round-trip
     await check_upload_quota(
-        current_user["tenant_id"], 
+        tenant_id, 
         upload_request.file_size, 
-        db
+        db,
+        project_access=_project_access_filter(project_uuid, current_user)
     )
     
     # Validate file extension
     file_ext = os.path.splitext(upload_request.filename)[1].lower()
     
     if upload_request.file_type == 'video':
-        if file_ext not in settings.ALLOWED_VIDEO_EXTENSIONS:
+        if file_ext not in _ALLOWED_VIDEO_EXT:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported video format. Allowed: {', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)}"
             )
     elif upload_request.file_type == 'script':
-        if file_ext not in settings.ALLOWED_SCRIPT_EXTENSIONS:
+        if file_ext not in _ALLOWED_SCRIPT_EXT:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported script format. Allowed: {', '.join(settings.ALLOWED_SCRIPT_EXTENSIONS)}"
@@ -148,12 +224,11 @@ async def initialize_upload(
     
     try:
         # Initialize Google Drive upload
-        drive_service = GoogleDriveService()
         upload_session = await drive_service.create_resumable_upload(
             filename=upload_request.filename,
             file_size=upload_request.file_size,
             content_type=upload_request.content_type,
-            folder_path=f"inputs/{current_user['user_id']}/{project_uuid}"
+            folder_path=f"inputs/{user_id}/{project_uuid}"
         )
         
         return UploadSession(
@@ -175,13 +250,15 @@ async def complete_upload(
     upload_id: str,
     complete_request: UploadCompleteRequest,
     current_user: dict = Depends(get_current_user_token),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    drive_service: GoogleDriveService = Depends(get_drive_service)
 ):
     """Complete upload and trigger processing."""
     
+    tenant_id = current_user["tenant_id"]
+    
     try:
         # Get upload session info from Google Drive
-        drive_service = GoogleDriveService()
         upload_info = await drive_service.complete_upload(upload_id)
         
         if not upload_info:
@@ -192,22 +269,7 @@ async def complete_upload(
         
         # Verify project access
         project_uuid = uuid.UUID(upload_info['project_id'])
-        result = await db.execute(
-            select(Project).where(
-                and_(
-                    Project.id == project_uuid,
-                    Project.user_id == current_user["user_id"],
-                    Project.tenant_id == current_user["tenant_id"]
-                )
-            )
-        )
-        
-        project = result.scalar_one_or_none()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
+        await _verify_project_access(project_uuid, current_user, db)
         
         # Verify checksum if provided
         if complete_request.checksum:
@@ -220,7 +282,7 @@ async def complete_upload(
         # Create asset record
         asset = Asset(
             project_id=project_uuid,
-            tenant_id=current_user["tenant_id"],
+            tenant_id=tenant_id,
             type=upload_info['file_type'],
             filename=upload_info['filename'],
             storage_path=upload_info['file_path'],
@@ -234,30 +296,36 @@ async def complete_upload(
         db.add(asset)
         await db.commit()
         await db.refresh(asset)
+        await cache_incr_existing(storage_used_key(tenant_id), asset.size_bytes)
+        # Project stats count assets
+        await cache_invalidate(project_cache_namespace(current_user))
         
-        # Trigger validation and preprocessing
-        from app.workers.celery_app import celery_app
-        
-        # Queue validation task
-        validation_task = validate_upload.delay(
-            file_path=upload_info['file_path'],
-            file_type=upload_info['file_type']
-        )
-        
-        # Queue preprocessing if validation succeeds
-        if upload_info['file_type'] == 'video':
-            from app.workers.preprocessing import preprocess_video
-            
-            preprocess_task = preprocess_video.delay(
-                job_id=str(uuid.uuid4()),
-                asset_id=str(asset.id),
-                file_path=upload_info['file_path']
+        # Trigger validation and preprocessing, published together over
+        # one broker connection
+        tasks = [
+            celery_app.signature(
+                VALIDATE_UPLOAD_TASK,
+                kwargs={
+                    "file_path": upload_info['file_path'],
+                    "file_type": upload_info['file_type']
+                }
             )
+        ]
+        if upload_info['file_type'] == 'video':
+            tasks.append(celery_app.signature(
+                PREPROCESS_VIDEO_TASK,
+                kwargs={
+                    "job_id": str(uuid.uuid4()),
+                    "asset_id": str(asset.id),
+                    "file_path": upload_info['file_path']
+                }
+            ))
+        dispatched = group(tasks).apply_async()
         
         return {
             "status": "success",
             "asset_id": str(asset.id),
-            "validation_task_id": validation_task.id,
+            "validation_task_id": dispatched.results[0].id,
             "message": "Upload completed successfully. Processing started."
         }
         
@@ -274,12 +342,12 @@ async def complete_upload(
 @router.get("/{upload_id}/status")
 async def get_upload_status(
     upload_id: str,
-    current_user: dict = Depends(get_current_user_token)
+    current_user: dict = Depends(get_current_user_token),
+    drive_service: GoogleDriveService = Depends(get_drive_service)
 ):
     """Get upload session status."""
     
     try:
-        drive_service = GoogleDriveService()
         status_info = await drive_service.get_upload_status(upload_id)
         
         if not status_info:
@@ -301,16 +369,28 @@ async def get_upload_status(
 
 @router.post("/direct", response_model=AssetResponse)
 async def direct_upload(
+    request: Request,
     project_id: str = Form(...),
     file_type: str = Form(...),
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user_token),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    drive_service: GoogleDriveService = Depends(get_drive_service)
 ):
     """Direct file upload for smaller files (< 100MB)."""
     
-    # Size limit for direct upload
-    MAX_DIRECT_UPLOAD = 100 * 1024 * 1024  # 100MB
+    user_id = current_user["user_id"]
+    tenant_id = current_user["tenant_id"]
+    
+    # Reject oversize bodies from the declared length before touching the
+    # database or the spooled file
+    declared_size = request.headers.get("content-length")
+    if declared_size and declared_size.isdigit() and \
+            int(declared_size) > MAX_DIRECT_UPLOAD + DIRECT_UPLOAD_FORM_OVERHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large for direct upload. Use resumable upload for files > {MAX_DIRECT_UPLOAD} bytes"
+        )
     
     try:
         project_uuid = uuid.UUID(project_id)
@@ -320,28 +400,8 @@ async def direct_upload(
             detail="Invalid project ID format"
         )
     
-    # Verify project
-    result = await db.execute(
-        select(Project).where(
-            and_(
-                Project.id == project_uuid,
-                Project.user_id == current_user["user_id"],
-                Project.tenant_id == current_user["tenant_id"]
-            )
-        )
-    )
-    
-    project = result.scalar_one_or_none()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    # Check file size
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
+    # Size counted by the multipart parser while spooling the file
+    file_size = file.size
     
     if file_size > MAX_DIRECT_UPLOAD:
         raise HTTPException(
@@ -349,31 +409,37 @@ async def direct_upload(
             detail=f"File too large for direct upload. Use resumable upload for files > {MAX_DIRECT_UPLOAD} bytes"
         )
     
-    # Check quota
-    await check_upload_quota(current_user["tenant_id"], file_size, db)
+    # Verify project access and check quota in one round-trip
+    await check_upload_quota(
+        tenant_id,
+        file_size,
+        db,
+        project_access=_project_access_filter(project_uuid, current_user)
+    )
     
     try:
-        # Save file temporarily
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        # Hash the spooled upload in chunks, off the event loop, so it is
+        # never held in memory as a whole
+        checksum, bytes_read = await run_in_threadpool(_hash_file, file.file)
         
-        # Calculate checksum
-        checksum = hashlib.sha256(content).hexdigest()
+        if bytes_read != file_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is incomplete"
+            )
         
-        # Upload to Google Drive
-        drive_service = GoogleDriveService()
-        drive_info = await drive_service.upload_file(
-            file_path=temp_path,
+        # Stream the spooled upload to Google Drive without a temp copy
+        await file.seek(0)
+        drive_info = await drive_service.upload_stream(
+            stream=file.file,
             filename=file.filename,
-            folder_path=f"inputs/{current_user['user_id']}/{project_uuid}"
+            folder_path=f"inputs/{user_id}/{project_uuid}"
         )
         
         # Create asset record
         asset = Asset(
             project_id=project_uuid,
-            tenant_id=current_user["tenant_id"],
+            tenant_id=tenant_id,
             type=file_type,
             filename=file.filename,
             storage_path=drive_info['file_path'],
@@ -387,57 +453,74 @@ async def direct_upload(
         db.add(asset)
         await db.commit()
         await db.refresh(asset)
-        
-        # Cleanup temp file
-        os.unlink(temp_path)
+        await cache_incr_existing(storage_used_key(tenant_id), file_size)
+        # Project stats count assets
+        await cache_invalidate(project_cache_namespace(current_user))
         
         return AssetResponse(**asset.to_dict())
         
     except Exception as e:
         await db.rollback()
-        if 'temp_path' in locals():
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-        
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload file: {str(e)}"
         )
 
 
-async def check_upload_quota(tenant_id: str, file_size: int, db: AsyncSession):
-    """Check if upload would exceed tenant quota."""
+async def check_upload_quota(tenant_id: str, file_size: int, db: AsyncSession, project_access=None):
+    """Check if upload would exceed tenant quota.
     
-    from app.models.tenant import Tenant
-    from sqlalchemy import func
+    Storage usage comes from a Redis counter kept current by asset inserts;
+    the SUM over the tenant's assets only runs to seed it. When given a
+    project_access filter, the project is checked in the same query and a
+    missing project raises 404.
+    """
     
-    # Get tenant quota
-    result = await db.execute(
-        select(Tenant).where(Tenant.id == tenant_id)
-    )
-    tenant = result.scalar_one_or_none()
+    key = storage_used_key(tenant_id)
+    cached_usage = await cache_get(key)
+    
+    query = select(Tenant.quota_storage_bytes.label("quota")).where(Tenant.id == tenant_id)
+    if cached_usage is None:
+        # Tenant quota and current usage in one round-trip
+        query = query.add_columns(
+            select(func.coalesce(func.sum(Asset.size_bytes), 0))
+            .where(Asset.tenant_id == Tenant.id)
+            .scalar_subquery()
+            .label("current_usage")
+        )
+    if project_access is not None:
+        query = query.add_columns(
+            exists().where(project_access).label("project_exists")
+        )
+    
+    row = (await db.execute(query)).first()
     
-    if not tenant:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant not found"
         )
     
-    # Calculate current usage
-    usage_result = await db.execute(
-        select(func.coalesce(func.sum(Asset.size_bytes), 0)).where(
-            Asset.tenant_id == tenant_id
+    if project_access is not None and not row.project_exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
         )
-    )
-    current_usage = usage_result.scalar()
+    
+    quota = row.quota
+    if cached_usage is not None:
+        current_usage = int(cached_usage)
+    else:
+        current_usage = row.current_usage
+        await cache_set(key, str(current_usage).encode(), STORAGE_USED_TTL, nx=True)
     
     # Check if new upload would exceed quota
-    if current_usage + file_size > tenant.quota_storage_bytes:
+    if current_usage + file_size > quota:
         raise QuotaExceededException(
             message="Upload would exceed storage quota",
             quota_type="storage",
             current_usage=current_usage,
-            limit=tenant.quota_storage_bytes
+            limit=quota
         )
\ No newline at end of file
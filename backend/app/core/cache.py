@@ -0,0 +1,194 @@
+"""
+Response Cache
+
+Redis-backed cache for read-heavy API responses. Cache failures never fail
+the request: reads fall through to the database and writes are dropped.
+
+Keys are grouped into namespaces that carry a version counter. Invalidating
+a namespace bumps its version, so later reads build new keys and the old
+entries simply age out with their TTL.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+
+# In-process calls currently being computed, keyed like the cache
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def get_redis_client() -> redis.Redis:
+    """Get the shared Redis client with connection pooling."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE
+        )
+    return _redis_client
+
+
+def _namespace_version_key(namespace: str) -> str:
+    return f"cachever:{namespace}"
+
+
+async def cache_key(namespace: str, *parts) -> str:
+    """Build a cache key under the namespace's current version."""
+    try:
+        version = await get_redis_client().get(_namespace_version_key(namespace))
+    except redis.RedisError as e:
+        # The entry itself cannot be read either, so any version will do
+        logger.warning(f"Cache version read failed for {namespace}: {e}")
+        version = None
+    return ":".join([
+        namespace,
+        f"v{int(version) if version is not None else 0}",
+        *(str(part) for part in parts),
+    ])
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Return the cached body for a key, or None on miss or error."""
+    try:
+        return await get_redis_client().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int, nx: bool = False) -> None:
+    """Store a body under a key for ttl seconds; with nx, only if absent."""
+    try:
+        await get_redis_client().set(key, value, ex=ttl, nx=nx)
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+async def cache_delete(key: str) -> None:
+    """Drop a single cached entry."""
+    try:
+        await get_redis_client().delete(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed for {key}: {e}")
+
+
+async def cache_incr(key: str, ttl: int) -> int:
+    """Increment a counter, (re)starting its ttl; returns 0 if Redis is down."""
+    try:
+        async with get_redis_client().pipeline(transaction=True) as pipe:
+            count, _ = await pipe.incr(key).expire(key, ttl).execute()
+        return count
+    except redis.RedisError as e:
+        logger.warning(f"Cache increment failed for {key}: {e}")
+        return 0
+
+
+# Adds to a counter only while it is cached, so a write never seeds a
+# partial value in place of the full one
+_INCR_EXISTING_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+
+async def cache_incr_existing(key: str, amount: int) -> Optional[int]:
+    """Add amount to a cached counter; None if it is not cached or Redis is down."""
+    try:
+        return await get_redis_client().eval(_INCR_EXISTING_LUA, 1, key, amount)
+    except redis.RedisError as e:
+        logger.warning(f"Cache increment failed for {key}: {e}")
+        return None
+
+
+async def cache_invalidate(namespace: str) -> None:
+    """Stop serving every cached entry in a namespace.
+    
+    Bumps the namespace version instead of deleting keys. A reader that
+    started before the write may still store its result, but under the old
+    version, where nobody looks for it again.
+    """
+    try:
+        await get_redis_client().incr(_namespace_version_key(namespace))
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {namespace}: {e}")
+
+
+# Token bucket: refills `rate` tokens per second up to `capacity`, takes one.
+# Returns 1 if a token was taken, 0 if the bucket is empty.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return allowed
+"""
+
+
+async def take_token(key: str, capacity: int, per_seconds: int) -> bool:
+    """Take one token from a Redis token bucket refilling capacity per window.
+
+    Returns True when the caller may proceed. Fails open if Redis is down.
+    """
+    try:
+        allowed = await get_redis_client().eval(
+            _TOKEN_BUCKET_LUA, 1, key, capacity, capacity / per_seconds, time.time()
+        )
+        return bool(allowed)
+    except redis.RedisError as e:
+        logger.warning(f"Rate limit check failed for {key}: {e}")
+        return True
+
+
+async def coalesce(key: str, producer: Callable[[], Awaitable[Any]]) -> Any:
+    """Share one producer call between concurrent callers with the same key.
+
+    Complements the Redis cache on misses: identical requests arriving while
+    the first one is still querying wait for its result instead of issuing
+    their own queries. If the caller running the producer is cancelled, a
+    waiter takes over and calls it again.
+    """
+    while (future := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only the shared call was cancelled, not this caller: retry
+            if not future.cancelled() or asyncio.current_task().cancelling():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await producer()
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved when nobody else was waiting
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
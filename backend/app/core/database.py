@@ -6,21 +6,56 @@ Async SQLAlchemy setup with connection pooling and session management.
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 import asyncio
 
 from app.core.config import settings
 
+# JIT compilation costs more than it saves on our short OLTP queries.
+# Each connection keeps every statement shape we issue prepared, so hot
+# queries skip parsing and planning on the server.
+_connect_args = {
+    "server_settings": {"jit": "off"},
+    "prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+}
+
+# Pool options only apply to a real pool; NullPool rejects them
+if settings.TESTING:
+    # A few reused connections instead of a connect + auth per query; the
+    # test run must keep one event loop since connections are bound to it
+    _pool_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": 5,
+        "max_overflow": 0,
+    }
+elif settings.DATABASE_USE_PGBOUNCER:
+    # PgBouncer already pools server connections; a second pool in front of
+    # it only pins them. Transaction pooling also hands each transaction a
+    # different server connection, so prepared statements cannot be cached
+    # and startup parameters like jit are rejected (set it on the role).
+    _pool_options = {"poolclass": NullPool}
+    _connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+else:
+    _pool_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        # Fail fast when the pool is exhausted instead of queueing requests
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    }
+
 # Create async engine with connection pooling
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,  # Verify connections before use
-    poolclass=NullPool if settings.TESTING else None,
+    # Room for every statement shape we issue so compiled SQL is reused
+    query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+    connect_args=_connect_args,
+    **_pool_options,
 )
 
 # Create async session factory
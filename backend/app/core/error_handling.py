@@ -3,18 +3,22 @@ Error handling middleware and utilities.
 """
 import json
 import logging
-import traceback
+import time
 from typing import Any, Dict, Optional
 from datetime import datetime
 
 from fastapi import Request, Response
-from fastapi.responses import JSONResponse
+from sqlalchemy import text
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from ..core.exceptions import BaseAPIException
+from ..core.responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
+# Built once; SQLAlchemy caches its compiled form across health probes
+_SELECT_ONE = text("SELECT 1")
+
 
 class ErrorHandlingMiddleware(BaseHTTPMiddleware):
     """Middleware to handle errors and format responses consistently."""
@@ -28,7 +32,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
         except Exception as exc:
             return await self.handle_unexpected_exception(request, exc)
     
-    async def handle_api_exception(self, request: Request, exc: BaseAPIException) -> JSONResponse:
+    async def handle_api_exception(self, request: Request, exc: BaseAPIException) -> ORJSONResponse:
         """Handle known API exceptions."""
         logger.warning(
             f"API Exception: {exc.error_code} - {exc.detail}",
@@ -43,20 +47,20 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
             }
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content={
                 "error": {
                     "code": exc.error_code,
                     "message": exc.detail,
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": datetime.utcnow(),
                     "path": request.url.path
                 }
             },
             headers=exc.headers
         )
     
-    async def handle_unexpected_exception(self, request: Request, exc: Exception) -> JSONResponse:
+    async def handle_unexpected_exception(self, request: Request, exc: Exception) -> ORJSONResponse:
         """Handle unexpected exceptions."""
         logger.error(
             f"Unexpected exception: {type(exc).__name__}: {str(exc)}",
@@ -65,18 +69,19 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 "method": request.method,
                 "client_ip": request.client.host if request.client else None,
                 "user_agent": request.headers.get("user-agent"),
-                "tenant_id": request.headers.get("x-tenant-id"),
-                "traceback": traceback.format_exc()
-            }
+                "tenant_id": request.headers.get("x-tenant-id")
+            },
+            # Formatted by the handler only if the record is emitted
+            exc_info=exc
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": {
                     "code": "INTERNAL_SERVER_ERROR",
                     "message": "An unexpected error occurred",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": datetime.utcnow(),
                     "path": request.url.path
                 }
             }
@@ -88,20 +93,20 @@ def create_error_response(
     error_code: str,
     message: str,
     details: Optional[Dict[str, Any]] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Create a standardized error response."""
     content: Dict[str, Any] = {
         "error": {
             "code": error_code,
             "message": message,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
     }
     
     if details:
         content["error"]["details"] = details
     
-    return JSONResponse(status_code=status_code, content=content)
+    return ORJSONResponse(status_code=status_code, content=content)
 
 
 class ValidationErrorHandler:
@@ -123,7 +128,7 @@ class ValidationErrorHandler:
         return formatted_errors
     
     @staticmethod
-    def create_validation_error_response(errors: list) -> JSONResponse:
+    def create_validation_error_response(errors: list) -> ORJSONResponse:
         """Create a validation error response."""
         formatted_errors = ValidationErrorHandler.format_pydantic_errors(errors)
         
@@ -159,7 +164,14 @@ class RetryHandler:
 
 
 class CircuitBreaker:
-    """Simple circuit breaker implementation."""
+    """Simple circuit breaker implementation.
+    
+    Safe to share between coroutines without a lock: state only changes in
+    synchronous sections between awaits. While HALF_OPEN, only the caller
+    that made the transition gets through as the trial call.
+    """
+    
+    __slots__ = ("failure_threshold", "timeout", "failure_count", "last_failure_time", "state")
     
     def __init__(self, failure_threshold: int = 5, timeout: int = 60):
         self.failure_threshold = failure_threshold
@@ -170,11 +182,7 @@ class CircuitBreaker:
     
     def call(self, func, *args, **kwargs):
         """Execute function with circuit breaker protection."""
-        if self.state == "OPEN":
-            if self._should_attempt_reset():
-                self.state = "HALF_OPEN"
-            else:
-                raise Exception("Circuit breaker is OPEN")
+        self._before_call()
         
         try:
             result = func(*args, **kwargs)
@@ -183,23 +191,59 @@ class CircuitBreaker:
         except Exception as e:
             self._on_failure()
             raise e
+        except BaseException:
+            self._on_abort()
+            raise
+    
+    async def call_async(self, func, *args, **kwargs):
+        """Await a coroutine function with circuit breaker protection."""
+        self._before_call()
+        
+        try:
+            result = await func(*args, **kwargs)
+            self._on_success()
+            return result
+        except Exception as e:
+            self._on_failure()
+            raise e
+        except BaseException:
+            # Cancelled before an outcome; a trial must not stay in flight
+            self._on_abort()
+            raise
+    
+    def _before_call(self):
+        """Reject the call unless the circuit lets it through."""
+        if self.state == "CLOSED":
+            return
+        if self.state == "OPEN" and self._should_attempt_reset():
+            self.state = "HALF_OPEN"
+            return
+        raise Exception(f"Circuit breaker is {self.state}")
     
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt reset."""
         if self.last_failure_time is None:
             return True
         
-        return (datetime.utcnow() - self.last_failure_time).seconds >= self.timeout
+        return time.monotonic() - self.last_failure_time >= self.timeout
     
     def _on_success(self):
         """Handle successful call."""
-        self.failure_count = 0
-        self.state = "CLOSED"
+        # Nothing to reset on the common path
+        if self.failure_count or self.state != "CLOSED":
+            self.failure_count = 0
+            self.state = "CLOSED"
+    
+    def _on_abort(self):
+        """Handle a call that ended without success or failure."""
+        if self.state == "HALF_OPEN":
+            self.state = "OPEN"
+            self.last_failure_time = time.monotonic()
     
     def _on_failure(self):
         """Handle failed call."""
         self.failure_count += 1
-        self.last_failure_time = datetime.utcnow()
+        self.last_failure_time = time.monotonic()
         
         if self.failure_count >= self.failure_threshold:
             self.state = "OPEN"
@@ -213,8 +257,10 @@ class HealthChecker:
         """Check database health."""
         try:
             # Simple query to check database connectivity
-            result = await db.execute("SELECT 1")
-            return {"status": "healthy", "response_time_ms": 0}
+            started = time.perf_counter()
+            await db.execute(_SELECT_ONE)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            return {"status": "healthy", "response_time_ms": round(elapsed_ms, 2)}
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
     
@@ -222,8 +268,10 @@ class HealthChecker:
     async def check_redis_health(redis) -> Dict[str, Any]:
         """Check Redis health."""
         try:
+            started = time.perf_counter()
             await redis.ping()
-            return {"status": "healthy"}
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            return {"status": "healthy", "response_time_ms": round(elapsed_ms, 2)}
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
     
@@ -1,6 +1,7 @@
 """
 Custom exceptions for the movie recap service.
 """
+from functools import lru_cache
 from typing import Any, Dict, Optional
 from fastapi import HTTPException, status
 
@@ -19,15 +20,20 @@ class BaseAPIException(HTTPException):
         self.error_code = error_code
 
 
+@lru_cache(maxsize=256)
+def _validation_error_code(field: Optional[str]) -> str:
+    """Error code for a validation failure, built once per field name."""
+    return f"VALIDATION_ERROR_{field.upper()}" if field else "VALIDATION_ERROR"
+
+
 class ValidationError(BaseAPIException):
     """Validation error."""
     
     def __init__(self, detail: str, field: Optional[str] = None):
-        error_code = f"VALIDATION_ERROR_{field.upper()}" if field else "VALIDATION_ERROR"
         super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=detail,
-            error_code=error_code
+            error_code=_validation_error_code(field)
         )
 
 
@@ -3,15 +3,17 @@ Monitoring and metrics collection utilities.
 """
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from array import array
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Callable, Deque, Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class MetricPoint:
     """A single metric data point."""
     name: str
@@ -25,76 +27,155 @@ class MetricPoint:
         return f'{self.name}{{{tags_str}}} {self.value} {int(self.timestamp.timestamp() * 1000)}'
 
 
+@lru_cache(maxsize=4096)
+def _series_key(name: str, tag_items: frozenset) -> str:
+    """Stable key for a metric name and tag set, cached per distinct series."""
+    tags_str = ','.join(f'{k}={v}' for k, v in sorted(tag_items))
+    return f"{name}:{tags_str}"
+
+
+# Most recent observations kept per histogram series
+HISTOGRAM_SAMPLE_SIZE = 1024
+
+
+class _HistAgg:
+    """Running aggregate for one histogram series.
+    
+    Count, sum, min and max are exact; only the latest
+    HISTOGRAM_SAMPLE_SIZE observations are kept, in a fixed ring.
+    """
+    
+    __slots__ = ("n", "sum", "min", "max", "samples", "idx")
+    
+    def __init__(self):
+        self.n = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.samples = array("d", bytes(8 * HISTOGRAM_SAMPLE_SIZE))
+        self.idx = 0
+    
+    def add(self, value: float) -> None:
+        self.n += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.samples[self.idx] = value
+        self.idx = (self.idx + 1) % HISTOGRAM_SAMPLE_SIZE
+    
+    def recent(self) -> List[float]:
+        """The retained observations, oldest first."""
+        if self.n < HISTOGRAM_SAMPLE_SIZE:
+            return self.samples[:self.n].tolist()
+        return (self.samples[self.idx:] + self.samples[:self.idx]).tolist()
+
+
+class _Timer:
+    """Times a block and records it as a ``<name>_duration_seconds`` histogram."""
+    
+    __slots__ = ("collector", "metric_name", "tags", "start")
+    
+    def __init__(self, collector: "MetricsCollector", name: str, tags: Optional[Dict[str, str]]):
+        self.collector = collector
+        self.metric_name = f"{name}_duration_seconds"
+        self.tags = tags
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.collector.histogram(self.metric_name, time.perf_counter() - self.start, self.tags)
+        return False
+
+
 class MetricsCollector:
     """Centralized metrics collection."""
     
     def __init__(self):
-        self.metrics: List[MetricPoint] = []
-        self.counters: Dict[str, float] = {}
+        # Only aggregates are kept; points are built from them on export
+        self.counters: Dict[str, float] = defaultdict(float)
         self.gauges: Dict[str, float] = {}
-        self.histograms: Dict[str, List[float]] = {}
+        self.histograms: Dict[str, _HistAgg] = defaultdict(_HistAgg)
+        self.series: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        self.points_recorded = 0
+        # Called before every read so buffered observations are included
+        self.flush_hooks: List[Callable[[], None]] = []
     
     def counter(self, name: str, value: float = 1.0, tags: Optional[Dict[str, str]] = None) -> None:
         """Record a counter metric."""
         tags = tags or {}
-        key = f"{name}:{','.join(sorted(tags.items()))}"
-        self.counters[key] = self.counters.get(key, 0) + value
-        
-        self.metrics.append(MetricPoint(
-            name=name,
-            value=value,
-            timestamp=datetime.utcnow(),
-            tags=tags
-        ))
+        key = _series_key(name, frozenset(tags.items()))
+        self.counters[key] += value
+        self._record(key, name, tags)
     
     def gauge(self, name: str, value: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Record a gauge metric."""
         tags = tags or {}
-        key = f"{name}:{','.join(sorted(tags.items()))}"
+        key = _series_key(name, frozenset(tags.items()))
         self.gauges[key] = value
-        
-        self.metrics.append(MetricPoint(
-            name=name,
-            value=value,
-            timestamp=datetime.utcnow(),
-            tags=tags
-        ))
+        self._record(key, name, tags)
     
     def histogram(self, name: str, value: float, tags: Optional[Dict[str, str]] = None) -> None:
         """Record a histogram metric."""
         tags = tags or {}
-        key = f"{name}:{','.join(sorted(tags.items()))}"
-        
-        if key not in self.histograms:
-            self.histograms[key] = []
-        self.histograms[key].append(value)
-        
-        self.metrics.append(MetricPoint(
-            name=name,
-            value=value,
-            timestamp=datetime.utcnow(),
-            tags=tags
-        ))
-    
-    @contextmanager
-    def timer(self, name: str, tags: Optional[Dict[str, str]] = None):
+        key = _series_key(name, frozenset(tags.items()))
+        self.histograms[key].add(value)
+        self._record(key, name, tags)
+    
+    def _record(self, key: str, name: str, tags: Dict[str, str]) -> None:
+        """Remember the name and tags behind a series key."""
+        if key not in self.series:
+            self.series[key] = (name, dict(tags))
+        self.points_recorded += 1
+    
+    def timer(self, name: str, tags: Optional[Dict[str, str]] = None) -> _Timer:
         """Context manager for timing operations."""
-        start_time = time.time()
-        try:
-            yield
-        finally:
-            duration = time.time() - start_time
-            self.histogram(f"{name}_duration_seconds", duration, tags)
+        return _Timer(self, name, tags)
+    
+    def flush(self) -> None:
+        """Aggregate observations buffered by recorders."""
+        for hook in self.flush_hooks:
+            hook()
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get summary of collected metrics."""
+        self.flush()
         return {
             "counters": dict(self.counters),
             "gauges": dict(self.gauges),
-            "histograms": {k: {"count": len(v), "sum": sum(v), "avg": sum(v)/len(v) if v else 0} 
+            "histograms": {k: {"count": v.n, "sum": v.sum, "avg": v.sum / v.n if v.n else 0,
+                               "min": v.min, "max": v.max}
                           for k, v in self.histograms.items()},
-            "total_points": len(self.metrics)
+            "total_points": self.points_recorded
         }
+    
+    def snapshot(self) -> List[MetricPoint]:
+        """Build the current value of every series as metric points.
+        
+        Histograms are reported as their ``_count`` and ``_sum`` series.
+        """
+        self.flush()
+        now = datetime.utcnow()
+        points = []
+        for key, value in self.counters.items():
+            name, tags = self.series[key]
+            points.append(MetricPoint(name=name, value=value, timestamp=now, tags=tags))
+        for key, value in self.gauges.items():
+            name, tags = self.series[key]
+            points.append(MetricPoint(name=name, value=value, timestamp=now, tags=tags))
+        for key, agg in self.histograms.items():
+            name, tags = self.series[key]
+            points.append(MetricPoint(name=f"{name}_count", value=agg.n, timestamp=now, tags=tags))
+            points.append(MetricPoint(name=f"{name}_sum", value=agg.sum, timestamp=now, tags=tags))
+        return points
+
+
+# HTTP requests buffered before they are folded into the aggregates
+REQUEST_METRICS_BUFFER_SIZE = 65536
 
 
 class PerformanceMonitor:
@@ -102,17 +183,32 @@ class PerformanceMonitor:
     
     def __init__(self, metrics_collector: MetricsCollector):
         self.metrics = metrics_collector
+        self._http_requests: Deque[Tuple[str, str, int, float]] = deque()
+        metrics_collector.flush_hooks.append(self.flush_request_metrics)
     
     def record_request_metrics(self, method: str, path: str, status_code: int, duration: float):
-        """Record HTTP request metrics."""
-        tags = {
-            "method": method,
-            "path": path,
-            "status_code": str(status_code)
-        }
+        """Record HTTP request metrics.
         
-        self.metrics.counter("http_requests_total", 1.0, tags)
-        self.metrics.histogram("http_request_duration_seconds", duration, tags)
+        Only buffers the request; it is aggregated when metrics are read or
+        the buffer fills up.
+        """
+        self._http_requests.append((method, path, status_code, duration))
+        if len(self._http_requests) >= REQUEST_METRICS_BUFFER_SIZE:
+            self.flush_request_metrics()
+    
+    def flush_request_metrics(self):
+        """Fold buffered HTTP requests into the request counters and histograms."""
+        pending = self._http_requests
+        while pending:
+            method, path, status_code, duration = pending.popleft()
+            tags = {
+                "method": method,
+                "path": path,
+                "status_code": str(status_code)
+            }
+            
+            self.metrics.counter("http_requests_total", 1.0, tags)
+            self.metrics.histogram("http_request_duration_seconds", duration, tags)
     
     def record_database_metrics(self, operation: str, table: str, duration: float, success: bool):
         """Record database operation metrics."""
@@ -299,7 +395,7 @@ class MetricsExporter:
         """Export metrics in Prometheus format."""
         lines = []
         
-        for metric in self.metrics.metrics:
+        for metric in self.metrics.snapshot():
             lines.append(metric.to_prometheus_format())
         
         return '\n'.join(lines)
@@ -315,7 +411,7 @@ class MetricsExporter:
                     "timestamp": m.timestamp.isoformat(),
                     "tags": m.tags
                 }
-                for m in self.metrics.metrics
+                for m in self.metrics.snapshot()
             ],
             "summary": self.metrics.get_metrics_summary()
         }
@@ -331,7 +427,7 @@ class MetricsExporter:
                 raise ValueError(f"Unsupported format: {format_type}")
             
             # In production, implement actual HTTP client to send data
-            logger.info(f"Would send {len(self.metrics.metrics)} metrics to {endpoint}")
+            logger.info(f"Would send {len(self.metrics.series)} metrics to {endpoint}")
             
         except Exception as e:
             logger.error(f"Failed to export metrics: {e}")
@@ -0,0 +1,37 @@
+"""
+Pagination
+
+Keyset cursors for newest-first listings ordered by (created_at, id).
+
+Every cursor listing encodes its cursor here, but they hand it back in two
+ways. Jobs and projects return an envelope, so the cursor is its
+``next_cursor`` field. Tenants return a bare array, which has no room for
+it, so the cursor is sent in the ``X-Next-Cursor`` header; their NDJSON
+streams carry none. Either value is passed back unchanged as the
+``cursor`` query parameter.
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """Opaque keyset cursor pointing just past the given row."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Parse a cursor produced by encode_cursor."""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,32 @@
+"""
+Response Classes
+
+Fast JSON responses backed by orjson.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def dumps_json(content: Any) -> bytes:
+    """Serialize content the same way ORJSONResponse renders it."""
+    return orjson.dumps(
+        content,
+        default=str,
+        option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_UUID,
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Datetimes and UUIDs are serialized natively; anything else orjson does
+    not understand falls back to ``str``.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -5,24 +5,37 @@ JWT token handling, password hashing, and authentication utilities.
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import heapq
 import secrets
 import hashlib
+import time
 
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. New hashes use argon2id; bcrypt hashes still
+# verify and are upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM
+)
 
 # JWT security scheme
 security = HTTPBearer()
 
-# Token blacklist (in production, use Redis)
-token_blacklist = set()
+# Token blacklist (in production, use Redis). Maps each revoked token to
+# its expiry; entries are dropped once the token would be rejected anyway.
+token_blacklist: Dict[str, float] = {}
+_blacklist_expiry: List[Tuple[float, str]] = []
 
 
 def init_security():
@@ -36,6 +49,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash if the stored one is outdated."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
@@ -75,6 +96,16 @@ def create_refresh_token(
     return encoded_jwt
 
 
+@lru_cache(maxsize=8192)
+def _decode_token(token: str) -> Dict[str, Any]:
+    """Check a token's signature and decode it, once per distinct token.
+    
+    Clients resend the same token for its whole lifetime, so this skips
+    the signature check on repeat requests. Failures are not cached.
+    """
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
 def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
     """Verify and decode JWT token."""
     try:
@@ -85,7 +116,12 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
                 detail="Token has been revoked"
             )
         
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _decode_token(token)
+        
+        # A cached payload was only checked for expiry when first decoded
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            raise JWTError("Signature has expired.")
         
         # Verify token type
         if payload.get("type") != token_type:
@@ -103,9 +139,38 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
         )
 
 
+def verify_request_token(request: Request, token: str) -> Dict[str, Any]:
+    """Verify an access token at most once per request.
+    
+    Middleware and dependencies share request.state, so the first caller
+    pays for the signature check and later ones reuse its payload.
+    """
+    cached = getattr(request.state, "access_token", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    
+    payload = verify_token(token, "access")
+    request.state.access_token = (token, payload)
+    return payload
+
+
 def blacklist_token(token: str):
-    """Add token to blacklist."""
-    token_blacklist.add(token)
+    """Add token to blacklist until it expires."""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        exp = None
+    if exp is None:
+        exp = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    
+    token_blacklist[token] = exp
+    heapq.heappush(_blacklist_expiry, (exp, token))
+    
+    # Forget revoked tokens that have expired since
+    now = time.time()
+    while _blacklist_expiry and _blacklist_expiry[0][0] <= now:
+        _, expired = heapq.heappop(_blacklist_expiry)
+        token_blacklist.pop(expired, None)
 
 
 def generate_secure_token(length: int = 32) -> str:
@@ -119,11 +184,12 @@ def hash_refresh_token(token: str) -> str:
 
 
 async def get_current_user_token(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
     """Extract and verify current user from JWT token."""
     token = credentials.credentials
-    payload = verify_token(token, "access")
+    payload = verify_request_token(request, token)
     
     user_id = payload.get("sub")
     if user_id is None:
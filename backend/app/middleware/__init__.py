@@ -13,7 +13,7 @@ import redis.asyncio as redis
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.config import settings
-from app.core.security import verify_token
+from app.core.security import verify_request_token
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -82,7 +82,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         if auth_header and auth_header.startswith("Bearer "):
             try:
                 token = auth_header.split(" ")[1]
-                payload = verify_token(token, "access")
+                payload = verify_request_token(request, token)
                 return payload.get("sub"), payload.get("tenant_id")
             except:
                 pass
@@ -305,7 +305,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             auth_header = request.headers.get("Authorization")
             if auth_header and auth_header.startswith("Bearer "):
                 token = auth_header.split(" ")[1]
-                payload = verify_token(token, "access")
+                payload = verify_request_token(request, token)
                 
                 return {
                     "user_id": payload.get("sub"),
@@ -385,7 +385,7 @@ class TenantMiddleware(BaseHTTPMiddleware):
         
         try:
             token = auth_header.split(" ")[1]
-            payload = verify_token(token, "access")
+            payload = verify_request_token(request, token)
             
             return {
                 "user_id": payload.get("sub"),
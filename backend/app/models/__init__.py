@@ -15,6 +15,7 @@ from .content_moderation import ContentModeration
 from .usage_tracking import UsageTracking
 from .audit_log import AuditLog
 from .user_session import UserSession
+from .alert_rule import AlertRule
 
 __all__ = [
     "Tenant",
@@ -27,5 +28,6 @@ __all__ = [
     "ContentModeration",
     "UsageTracking",
     "AuditLog",
-    "UserSession"
+    "UserSession",
+    "AlertRule"
 ]
\ No newline at end of file
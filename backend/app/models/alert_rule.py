@@ -0,0 +1,31 @@
+"""
+Alert Rule Model
+
+Threshold rules evaluated against tenant usage metrics.
+"""
+
+from sqlalchemy import Column, String, Boolean, TIMESTAMP, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+
+from app.core.database import Base
+
+
+class AlertRule(Base):
+    """Alert rule; applies to every tenant unless tenant_id is set."""
+    
+    __tablename__ = "alert_rules"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(100), nullable=False, unique=True)
+    metric = Column(String(50), nullable=False)  # storage_used_gb, processing_hours, api_calls, bandwidth_used_gb
+    operator = Column(String(2), nullable=False)  # >, >=, <, <=
+    threshold = Column(Float, nullable=False)
+    severity = Column(String(20), nullable=False)  # critical, warning, info
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"))
+    is_active = Column(Boolean, default=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<AlertRule(name={self.name}, {self.metric} {self.operator} {self.threshold})>"
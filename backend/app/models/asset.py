@@ -59,4 +59,9 @@ class Asset(Base):
             "status": self.status,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
-        }
\ No newline at end of file
+        }
+
+
+def storage_used_key(tenant_id) -> str:
+    """Redis key caching the sum of a tenant's asset size_bytes."""
+    return f"tenant:{tenant_id}:storage_used"
\ No newline at end of file
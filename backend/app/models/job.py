@@ -4,7 +4,7 @@ Job Model
 Processing job management and tracking.
 """
 
-from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey, Integer, ARRAY
+from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey, Integer, ARRAY, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -37,6 +37,14 @@ class Job(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        # Newest-first job list per project
+        Index("idx_jobs_project_created", project_id, created_at.desc(), id.desc()),
+    )
+    # Fetch server-generated timestamps with RETURNING on flush so a saved
+    # job can be rendered without a refresh query
+    __mapper_args__ = {"eager_defaults": True}
+    
     # Relationships
     project = relationship("Project", back_populates="jobs")
     tenant = relationship("Tenant", back_populates="jobs")
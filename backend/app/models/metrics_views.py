@@ -0,0 +1,41 @@
+"""
+Metrics Views
+
+Read-only mappings of the materialized views backing analytics queries.
+"""
+
+from sqlalchemy import Table, Column, MetaData, Numeric, BigInteger, TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID
+
+# Kept out of Base.metadata so create_all never creates the views as tables;
+# they are defined in database/migrations/005_add_metrics_views.sql and
+# 008_add_user_activity_view.sql
+view_metadata = MetaData()
+
+tenant_usage_daily = Table(
+    "mv_tenant_usage_daily",
+    view_metadata,
+    Column("tenant_id", UUID(as_uuid=True)),
+    Column("day", TIMESTAMP(timezone=True)),
+    Column("storage_used", Numeric),
+    Column("processing_hours", Numeric),
+    Column("api_calls", Numeric),
+    Column("bandwidth_used", Numeric),
+)
+
+# Active-user windows are evaluated when the view is refreshed
+tenant_user_activity = Table(
+    "mv_tenant_user_activity",
+    view_metadata,
+    Column("tenant_id", UUID(as_uuid=True)),
+    Column("total_users", BigInteger),
+    Column("active_users_24h", BigInteger),
+    Column("active_users_7d", BigInteger),
+    Column("active_users_30d", BigInteger),
+    Column("new_users_7d", BigInteger),
+)
+
+MATERIALIZED_VIEWS = (tenant_usage_daily.name, tenant_user_activity.name)
+
+# Redis key holding the epoch time of the last successful view refresh
+MV_REFRESHED_AT_KEY = "mv:tenant_usage_daily:refreshed_at"
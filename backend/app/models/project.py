@@ -4,7 +4,7 @@ Project Model
 Project management for organizing user uploads and processing jobs.
 """
 
-from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, String, Text, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -28,6 +28,14 @@ class Project(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        # Newest-first project list for a user
+        Index(
+            "idx_projects_user_tenant_created",
+            user_id, tenant_id, created_at.desc(), id.desc()
+        ),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="projects")
     tenant = relationship("Tenant", back_populates="projects")
@@ -7,8 +7,7 @@ Multi-tenant support with quota management.
 from sqlalchemy import Column, String, Boolean, TIMESTAMP, BigInteger, Integer
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-import uuid
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
@@ -18,7 +17,7 @@ class Tenant(Base):
     
     __tablename__ = "tenants"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     name = Column(String(255), nullable=False, unique=True)
     display_name = Column(String(255), nullable=False)
     billing_plan = Column(String(50), default="free")
@@ -26,7 +25,9 @@ class Tenant(Base):
     quota_processing_hours = Column(Integer, default=10)
     quota_jobs_per_month = Column(Integer, default=50)
     settings = Column(JSONB, default={})
+    region = Column(String(50))  # Mirrors settings["region"]; maintained by a trigger
     is_active = Column(Boolean, default=True)
+    user_count = Column(Integer, nullable=False, server_default=text("0"))  # Maintained by triggers on users
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -50,7 +51,9 @@ class Tenant(Base):
             "quota_processing_hours": self.quota_processing_hours,
             "quota_jobs_per_month": self.quota_jobs_per_month,
             "settings": self.settings,
+            "region": self.region,
             "is_active": self.is_active,
+            "user_count": self.user_count,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
\ No newline at end of file
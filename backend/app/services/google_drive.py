@@ -4,12 +4,15 @@ Google Drive Integration Service
 Handle file uploads, downloads, and management with Google Drive API.
 """
 
+import asyncio
 import os
 import json
 import tempfile
 import hashlib
-from typing import Dict, Any, Optional, List
+from typing import BinaryIO, Dict, Any, Optional, List
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
@@ -18,12 +21,16 @@ import io
 
 from app.core.config import settings
 
+# Resumable upload chunk held in memory at a time; a multiple of 256 KiB
+DRIVE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class GoogleDriveService:
     """Google Drive API service for file operations."""
     
     def __init__(self, credentials_file: str = None):
         self.credentials_file = credentials_file or settings.GOOGLE_DRIVE_CREDENTIALS_FILE
+        self.credentials = None
         self.service = None
         self.root_folder_id = None
         
@@ -56,6 +63,7 @@ class GoogleDriveService:
             )
             
             # Build service
+            self.credentials = credentials
             self.service = build('drive', 'v3', credentials=credentials)
             
         except Exception as e:
@@ -229,6 +237,58 @@ class GoogleDriveService:
         except Exception as e:
             raise Exception(f"Failed to upload file: {str(e)}")
     
+    async def upload_stream(
+        self, 
+        stream: BinaryIO, 
+        filename: str, 
+        folder_path: str
+    ) -> Dict[str, Any]:
+        """Upload an open, seekable binary stream to Google Drive.
+        
+        The stream is sent in resumable chunks from where it already lives,
+        without copying it to a local file or into memory first.
+        """
+        
+        await self.initialize()
+        
+        try:
+            # Get folder
+            folder_id = await self._get_upload_folder(folder_path)
+            
+            # File metadata
+            file_metadata = {
+                'name': filename,
+                'parents': [folder_id]
+            }
+            
+            media = MediaIoBaseUpload(
+                stream,
+                mimetype=self._get_content_type(filename),
+                chunksize=DRIVE_UPLOAD_CHUNK_SIZE,
+                resumable=True
+            )
+            request = self.service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id,name,size,md5Checksum'
+            )
+            
+            # The client library blocks for the whole transfer, so it runs in a
+            # worker thread. httplib2 is not thread-safe: the thread gets its
+            # own transport instead of the shared service's.
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+            file_obj = await asyncio.to_thread(request.execute, http=http)
+            
+            return {
+                'file_id': file_obj.get('id'),
+                'file_path': f"{folder_path}/{filename}",
+                'file_size': int(file_obj.get('size', 0)),
+                'checksum': file_obj.get('md5Checksum')
+            }
+            
+        except Exception as e:
+            raise Exception(f"Failed to upload file: {str(e)}")
+    
     async def download_file(self, file_id: str, local_path: str) -> Dict[str, Any]:
         """Download file from Google Drive."""
         
@@ -470,4 +530,25 @@ class GoogleDriveService:
             
         except Exception as e:
             print(f"Failed to cleanup old files: {str(e)}")
-            return 0
\ No newline at end of file
+            return 0
+
+
+_drive_service: Optional[GoogleDriveService] = None
+_drive_lock = asyncio.Lock()
+
+
+async def get_drive_service() -> GoogleDriveService:
+    """Get the shared, initialized Google Drive service.
+    
+    Authentication and folder setup run once per process; concurrent first
+    callers wait for that single setup instead of repeating it. The service
+    account credentials refresh their access token on their own.
+    """
+    global _drive_service
+    if _drive_service is None:
+        async with _drive_lock:
+            if _drive_service is None:
+                drive_service = GoogleDriveService()
+                await drive_service.initialize()
+                _drive_service = drive_service
+    return _drive_service
@@ -0,0 +1,47 @@
+"""
+Analytics Worker
+
+Periodic maintenance of the materialized views behind analytics endpoints.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any
+
+import redis.asyncio as redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.models.metrics_views import MATERIALIZED_VIEWS, MV_REFRESHED_AT_KEY
+from app.workers.celery_app import celery_app
+
+
+async def _refresh_views() -> None:
+    # Each task run gets its own event loop, so it cannot share the API's pool
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            # CONCURRENTLY cannot run inside a transaction block
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for view in MATERIALIZED_VIEWS:
+                await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    finally:
+        await engine.dispose()
+    
+    # API workers derive analytics ETags from this, so they all agree on it
+    client = redis.from_url(settings.REDIS_URL)
+    try:
+        await client.set(MV_REFRESHED_AT_KEY, str(time.time()))
+    finally:
+        await client.aclose()
+
+
+@celery_app.task(bind=True)
+def refresh_metrics_views(self) -> Dict[str, Any]:
+    """Refresh analytics materialized views without blocking readers."""
+    
+    asyncio.run(_refresh_views())
+    
+    return {"refreshed": list(MATERIALIZED_VIEWS)}
@@ -4,6 +4,10 @@ Celery Configuration
 Celery app configuration for async task processing.
 """
 
+from typing import Any, Dict, List, Optional
+
+import orjson
+import redis.asyncio as redis
 from celery import Celery
 from app.core.config import settings
 
@@ -17,7 +21,8 @@ celery_app = Celery(
         "app.workers.transcription", 
         "app.workers.alignment",
         "app.workers.assembly",
-        "app.workers.moderation"
+        "app.workers.moderation",
+        "app.workers.analytics"
     ]
 )
 
@@ -43,6 +48,12 @@ celery_app.conf.update(
     worker_disable_rate_limits=False,
     task_compression="gzip",
     result_compression="gzip",
+    beat_schedule={
+        "refresh-metrics-views": {
+            "task": "app.workers.analytics.refresh_metrics_views",
+            "schedule": 600.0,  # Every 10 minutes
+        },
+    },
 )
 
 # Task retry configuration
@@ -63,5 +74,46 @@ celery_app.conf.task_annotations = {
     }
 }
 
+# Key the Redis result backend stores each task's state under
+TASK_META_KEY_PREFIX = "celery-task-meta-"
+
+_result_client: Optional[redis.Redis] = None
+
+
+def get_result_backend_client() -> redis.Redis:
+    """Get an async client for the Redis result backend."""
+    global _result_client
+    if _result_client is None:
+        _result_client = redis.from_url(
+            settings.CELERY_RESULT_BACKEND,
+            max_connections=settings.REDIS_POOL_SIZE
+        )
+    return _result_client
+
+
+async def get_task_states(task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Read task state and info straight from the result backend.
+    
+    Non-blocking counterpart to ``AsyncResult(task_id).state/.info`` for use
+    in async handlers; all ids are fetched with a single MGET. Tasks without
+    stored meta are reported as PENDING, as Celery does.
+    """
+    if not task_ids:
+        return {}
+    
+    raw = await get_result_backend_client().mget(
+        [TASK_META_KEY_PREFIX + task_id for task_id in task_ids]
+    )
+    
+    states = {}
+    for task_id, payload in zip(task_ids, raw):
+        if payload is None:
+            states[task_id] = {"state": "PENDING", "info": None}
+        else:
+            meta = orjson.loads(payload)
+            states[task_id] = {"state": meta["status"], "info": meta.get("result")}
+    return states
+
+
 if __name__ == "__main__":
     celery_app.start()
\ No newline at end of file
@@ -9,6 +9,8 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
+import logging
 import time
 import uvicorn
 from contextlib import asynccontextmanager
@@ -17,6 +19,8 @@ from app.core.config import settings
 from app.core.database import engine, create_db_and_tables
 from app.core.security import init_security
 from app.api.v1.router import api_router
+from app.api.v1.analytics import run_analytics_refresher
+from app.services.google_drive import get_drive_service
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.tenant import TenantMiddleware
@@ -27,6 +31,8 @@ from app.core.exceptions import (
     PermissionException
 )
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -34,10 +40,25 @@ async def lifespan(app: FastAPI):
     # Startup
     await create_db_and_tables()
     init_security()
+    analytics_refresher = None
+    if not settings.TESTING:
+        analytics_refresher = asyncio.create_task(run_analytics_refresher())
+        # Authenticate with Drive and resolve its folders before serving;
+        # uploads retry on first use if Drive is unavailable now
+        try:
+            await get_drive_service()
+        except Exception as e:
+            logger.warning(f"Google Drive initialization failed: {e}")
     
     yield
     
     # Shutdown
+    if analytics_refresher is not None:
+        analytics_refresher.cancel()
+        try:
+            await analytics_refresher
+        except asyncio.CancelledError:
+            pass
     await engine.dispose()
 
 
@@ -173,5 +194,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
-        workers=1 if settings.DEBUG else 4
+        workers=1 if settings.DEBUG else 4,
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -0,0 +1,52 @@
+-- Migration: 003_add_indexes
+-- Description: Performance indexes for hot API queries
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema; usage_tracking and user_sessions from schema.sql
+
+BEGIN;
+
+-- Admin tenant listing: active tenants newest first, optionally by plan,
+-- and substring search on name/display_name
+CREATE INDEX IF NOT EXISTS idx_tenants_active_created
+    ON tenants(created_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_tenants_billing_active_created
+    ON tenants(billing_plan, created_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_tenants_name_trgm
+    ON tenants USING gin(name gin_trgm_ops, display_name gin_trgm_ops);
+
+-- Regional analytics group active tenants by settings->>'region'
+CREATE INDEX IF NOT EXISTS idx_tenants_region
+    ON tenants((settings->>'region')) WHERE is_active;
+
+-- Per-tenant activity and signup cohorts in analytics
+CREATE INDEX IF NOT EXISTS idx_users_tenant_last_login
+    ON users(tenant_id, last_login DESC);
+CREATE INDEX IF NOT EXISTS idx_users_tenant_created
+    ON users(tenant_id, created_at DESC);
+
+-- Logout deactivates a user's live refresh sessions
+CREATE INDEX IF NOT EXISTS idx_sessions_user_active
+    ON user_sessions(user_id) WHERE is_active;
+
+-- Tenant usage aggregates filter on tenant and time window, then branch on
+-- resource type; INCLUDE amount so the scan never touches the heap
+CREATE INDEX IF NOT EXISTS idx_usage_tenant_created_type
+    ON usage_tracking(tenant_id, created_at, resource_type) INCLUDE (amount);
+
+-- Project and job list pages: a user's rows newest first, so
+-- ORDER BY created_at DESC LIMIT n reads the index instead of sorting
+CREATE INDEX IF NOT EXISTS idx_projects_user_tenant_created
+    ON projects(user_id, tenant_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_project_created
+    ON jobs(project_id, created_at DESC, id DESC);
+
+-- Upload quota checks sum a tenant's asset sizes; INCLUDE size_bytes so the
+-- sum is an index-only scan
+CREATE INDEX IF NOT EXISTS idx_assets_tenant_size
+    ON assets(tenant_id) INCLUDE (size_bytes);
+
+-- Project list substring search on title/description
+CREATE INDEX IF NOT EXISTS idx_projects_search_trgm
+    ON projects USING gin(title gin_trgm_ops, description gin_trgm_ops);
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- Migration: 005_add_metrics_views
+-- Description: Materialized daily usage rollups for analytics endpoints
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema; usage_tracking from schema.sql
+--
+-- Refreshed every 10 minutes by app.workers.analytics.refresh_metrics_views.
+
+BEGIN;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_tenant_usage_daily AS
+SELECT
+    tenant_id,
+    date_trunc('day', created_at) AS day,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'storage'), 0) AS storage_used,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'processing_time'), 0) AS processing_hours,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'api_calls'), 0) AS api_calls,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'bandwidth'), 0) AS bandwidth_used
+FROM usage_tracking
+GROUP BY tenant_id, date_trunc('day', created_at);
+
+-- Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_tenant_usage_daily_tenant_day
+    ON mv_tenant_usage_daily(tenant_id, day);
+
+COMMIT;
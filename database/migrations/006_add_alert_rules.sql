@@ -0,0 +1,29 @@
+-- Migration: 006_add_alert_rules
+-- Description: Alert rules evaluated in SQL against the daily usage rollup
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema, 005_add_metrics_views
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS alert_rules (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(100) NOT NULL UNIQUE,
+    metric VARCHAR(50) NOT NULL
+        CHECK (metric IN ('storage_used_gb', 'processing_hours', 'api_calls', 'bandwidth_used_gb')),
+    operator VARCHAR(2) NOT NULL CHECK (operator IN ('>', '>=', '<', '<=')),
+    threshold DOUBLE PRECISION NOT NULL,
+    severity VARCHAR(20) NOT NULL CHECK (severity IN ('critical', 'warning', 'info')),
+    tenant_id UUID REFERENCES tenants(id) ON DELETE CASCADE, -- NULL applies to all tenants
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_rules_active ON alert_rules(tenant_id) WHERE is_active;
+
+INSERT INTO alert_rules (name, metric, operator, threshold, severity) VALUES
+    ('high_storage_usage', 'storage_used_gb', '>', 100, 'warning'),
+    ('high_processing_hours', 'processing_hours', '>', 500, 'warning'),
+    ('high_bandwidth_usage', 'bandwidth_used_gb', '>', 1000, 'warning')
+ON CONFLICT (name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,38 @@
+-- Migration: 007_add_tenant_user_count
+-- Description: Denormalized per-tenant user count maintained by triggers
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema
+
+BEGIN;
+
+ALTER TABLE tenants ADD COLUMN IF NOT EXISTS user_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE tenants t
+SET user_count = (SELECT COUNT(*) FROM users u WHERE u.tenant_id = t.id);
+
+CREATE OR REPLACE FUNCTION update_tenant_user_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE tenants SET user_count = user_count + 1 WHERE id = NEW.tenant_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE tenants SET user_count = user_count - 1 WHERE id = OLD.tenant_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_tenant_user_count ON users;
+CREATE TRIGGER update_tenant_user_count AFTER INSERT OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION update_tenant_user_count();
+DROP TRIGGER IF EXISTS update_tenant_user_count_moved ON users;
+CREATE TRIGGER update_tenant_user_count_moved AFTER UPDATE OF tenant_id ON users
+    FOR EACH ROW WHEN (OLD.tenant_id IS DISTINCT FROM NEW.tenant_id)
+    EXECUTE FUNCTION update_tenant_user_count();
+
+-- Top tenants by user count for the health dashboard
+CREATE INDEX IF NOT EXISTS idx_tenants_active_user_count
+    ON tenants(user_count DESC) WHERE is_active;
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- Migration: 008_add_user_activity_view
+-- Description: Materialized per-tenant user activity counts for analytics
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema, 005_add_metrics_views
+--
+-- Windows are evaluated at refresh time; refreshed alongside
+-- mv_tenant_usage_daily by app.workers.analytics.refresh_metrics_views.
+
+BEGIN;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_tenant_user_activity AS
+SELECT
+    tenant_id,
+    COUNT(*) AS total_users,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '24 hours') AS active_users_24h,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '7 days') AS active_users_7d,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '30 days') AS active_users_30d,
+    COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS new_users_7d
+FROM users
+GROUP BY tenant_id;
+
+-- Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_tenant_user_activity_tenant
+    ON mv_tenant_user_activity(tenant_id);
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- Migration: 009_add_tenant_region
+-- Description: Promote settings->>'region' to an indexed tenants.region column
+-- Date: 2025-01-15
+-- Dependencies: 001_initial_schema, 003_add_indexes
+
+BEGIN;
+
+ALTER TABLE tenants ADD COLUMN IF NOT EXISTS region VARCHAR(50);
+
+UPDATE tenants SET region = settings->>'region';
+
+-- settings stays the source of truth; the column follows it on every write
+CREATE OR REPLACE FUNCTION sync_tenant_region()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.region = NEW.settings->>'region';
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_tenant_region ON tenants;
+CREATE TRIGGER sync_tenant_region BEFORE INSERT OR UPDATE OF settings ON tenants
+    FOR EACH ROW EXECUTE FUNCTION sync_tenant_region();
+
+-- Replaces the expression index from 003
+DROP INDEX IF EXISTS idx_tenants_region;
+CREATE INDEX IF NOT EXISTS idx_tenants_active_region ON tenants(region) WHERE is_active;
+
+COMMIT;
@@ -17,7 +17,9 @@ CREATE TABLE tenants (
     quota_processing_hours INTEGER DEFAULT 10,
     quota_jobs_per_month INTEGER DEFAULT 50,
     settings JSONB DEFAULT '{}',
+    region VARCHAR(50), -- Mirrors settings->>'region', kept in sync by trigger
     is_active BOOLEAN DEFAULT true,
+    user_count INTEGER NOT NULL DEFAULT 0, -- Maintained by triggers on users
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -25,6 +27,11 @@ CREATE TABLE tenants (
 -- Create index for tenant lookups
 CREATE INDEX idx_tenants_name ON tenants(name);
 CREATE INDEX idx_tenants_active ON tenants(is_active);
+CREATE INDEX idx_tenants_active_created ON tenants(created_at DESC, id DESC) WHERE is_active;
+CREATE INDEX idx_tenants_billing_active_created ON tenants(billing_plan, created_at DESC, id DESC) WHERE is_active;
+CREATE INDEX idx_tenants_name_trgm ON tenants USING gin(name gin_trgm_ops, display_name gin_trgm_ops);
+CREATE INDEX idx_tenants_active_region ON tenants(region) WHERE is_active;
+CREATE INDEX idx_tenants_active_user_count ON tenants(user_count DESC) WHERE is_active;
 
 -- Users table
 CREATE TABLE users (
@@ -50,6 +57,8 @@ CREATE TABLE users (
 CREATE INDEX idx_users_tenant_id ON users(tenant_id);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_active ON users(is_active);
+CREATE INDEX idx_users_tenant_last_login ON users(tenant_id, last_login DESC);
+CREATE INDEX idx_users_tenant_created ON users(tenant_id, created_at DESC);
 
 -- Projects table
 CREATE TABLE projects (
@@ -68,6 +77,8 @@ CREATE TABLE projects (
 CREATE INDEX idx_projects_user_id ON projects(user_id);
 CREATE INDEX idx_projects_tenant_id ON projects(tenant_id);
 CREATE INDEX idx_projects_status ON projects(status);
+CREATE INDEX idx_projects_user_tenant_created ON projects(user_id, tenant_id, created_at DESC, id DESC);
+CREATE INDEX idx_projects_search_trgm ON projects USING gin(title gin_trgm_ops, description gin_trgm_ops);
 
 -- Assets table - Store file metadata
 CREATE TABLE assets (
@@ -93,6 +104,7 @@ CREATE INDEX idx_assets_tenant_id ON assets(tenant_id);
 CREATE INDEX idx_assets_type ON assets(type);
 CREATE INDEX idx_assets_status ON assets(status);
 CREATE INDEX idx_assets_checksum ON assets(checksum);
+CREATE INDEX idx_assets_tenant_size ON assets(tenant_id) INCLUDE (size_bytes);
 
 -- Jobs table - Processing jobs
 CREATE TABLE jobs (
@@ -123,6 +135,7 @@ CREATE INDEX idx_jobs_status ON jobs(status);
 CREATE INDEX idx_jobs_type ON jobs(type);
 CREATE INDEX idx_jobs_created_at ON jobs(created_at);
 CREATE INDEX idx_jobs_priority_created ON jobs(priority DESC, created_at ASC);
+CREATE INDEX idx_jobs_project_created ON jobs(project_id, created_at DESC, id DESC);
 
 -- Scenes table - Script and video scene matching
 CREATE TABLE scenes (
@@ -209,6 +222,7 @@ CREATE TABLE usage_tracking (
 CREATE INDEX idx_usage_tenant_period ON usage_tracking(tenant_id, period_start, period_end);
 CREATE INDEX idx_usage_resource_type ON usage_tracking(resource_type);
 CREATE INDEX idx_usage_job_id ON usage_tracking(job_id);
+CREATE INDEX idx_usage_tenant_created_type ON usage_tracking(tenant_id, created_at, resource_type) INCLUDE (amount);
 
 -- Audit logs table
 CREATE TABLE audit_logs (
@@ -250,6 +264,23 @@ CREATE INDEX idx_sessions_user_id ON user_sessions(user_id);
 CREATE INDEX idx_sessions_token_hash ON user_sessions(refresh_token_hash);
 CREATE INDEX idx_sessions_expires_at ON user_sessions(expires_at);
 CREATE INDEX idx_sessions_active ON user_sessions(is_active);
+CREATE INDEX idx_sessions_user_active ON user_sessions(user_id) WHERE is_active;
+
+-- Alert rules evaluated against mv_tenant_usage_daily
+CREATE TABLE alert_rules (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(100) NOT NULL UNIQUE,
+    metric VARCHAR(50) NOT NULL
+        CHECK (metric IN ('storage_used_gb', 'processing_hours', 'api_calls', 'bandwidth_used_gb')),
+    operator VARCHAR(2) NOT NULL CHECK (operator IN ('>', '>=', '<', '<=')),
+    threshold DOUBLE PRECISION NOT NULL,
+    severity VARCHAR(20) NOT NULL CHECK (severity IN ('critical', 'warning', 'info')),
+    tenant_id UUID REFERENCES tenants(id) ON DELETE CASCADE, -- NULL applies to all tenants
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_alert_rules_active ON alert_rules(tenant_id) WHERE is_active;
 
 -- Row Level Security (RLS) for multi-tenancy
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -289,6 +320,38 @@ CREATE TRIGGER update_scenes_updated_at BEFORE UPDATE ON scenes
 CREATE TRIGGER update_moderation_updated_at BEFORE UPDATE ON content_moderation 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Keep tenants.region in step with settings
+CREATE OR REPLACE FUNCTION sync_tenant_region()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.region = NEW.settings->>'region';
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER sync_tenant_region BEFORE INSERT OR UPDATE OF settings ON tenants
+    FOR EACH ROW EXECUTE FUNCTION sync_tenant_region();
+
+-- Keep tenants.user_count in step with users
+CREATE OR REPLACE FUNCTION update_tenant_user_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE tenants SET user_count = user_count + 1 WHERE id = NEW.tenant_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE tenants SET user_count = user_count - 1 WHERE id = OLD.tenant_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_tenant_user_count AFTER INSERT OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION update_tenant_user_count();
+CREATE TRIGGER update_tenant_user_count_moved AFTER UPDATE OF tenant_id ON users
+    FOR EACH ROW WHEN (OLD.tenant_id IS DISTINCT FROM NEW.tenant_id)
+    EXECUTE FUNCTION update_tenant_user_count();
+
 -- Views for common queries
 CREATE VIEW user_quota_usage AS
 SELECT 
@@ -326,7 +389,42 @@ CREATE VIEW active_jobs AS
 SELECT * FROM jobs 
 WHERE status IN ('pending', 'running', 'manual_review');
 
+-- Daily usage rollup for analytics; refreshed concurrently by a Celery beat task
+CREATE MATERIALIZED VIEW mv_tenant_usage_daily AS
+SELECT
+    tenant_id,
+    date_trunc('day', created_at) AS day,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'storage'), 0) AS storage_used,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'processing_time'), 0) AS processing_hours,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'api_calls'), 0) AS api_calls,
+    COALESCE(SUM(amount) FILTER (WHERE resource_type = 'bandwidth'), 0) AS bandwidth_used
+FROM usage_tracking
+GROUP BY tenant_id, date_trunc('day', created_at);
+
+CREATE UNIQUE INDEX idx_mv_tenant_usage_daily_tenant_day ON mv_tenant_usage_daily(tenant_id, day);
+
+-- Per-tenant user activity; windows are evaluated at refresh time
+CREATE MATERIALIZED VIEW mv_tenant_user_activity AS
+SELECT
+    tenant_id,
+    COUNT(*) AS total_users,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '24 hours') AS active_users_24h,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '7 days') AS active_users_7d,
+    COUNT(*) FILTER (WHERE last_login >= NOW() - INTERVAL '30 days') AS active_users_30d,
+    COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS new_users_7d
+FROM users
+GROUP BY tenant_id;
+
+CREATE UNIQUE INDEX idx_mv_tenant_user_activity_tenant ON mv_tenant_user_activity(tenant_id);
+
 -- Insert default tenant for development
 INSERT INTO tenants (name, display_name, billing_plan) 
 VALUES ('default', 'Default Tenant', 'free')
+ON CONFLICT (name) DO NOTHING;
+
+-- Default alert rules
+INSERT INTO alert_rules (name, metric, operator, threshold, severity) VALUES
+    ('high_storage_usage', 'storage_used_gb', '>', 100, 'warning'),
+    ('high_processing_hours', 'processing_hours', '>', 500, 'warning'),
+    ('high_bandwidth_usage', 'bandwidth_used_gb', '>', 1000, 'warning')
 ON CONFLICT (name) DO NOTHING;
\ No newline at end of file
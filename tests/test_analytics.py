@@ -0,0 +1,24 @@
+"""
+Test analytics SQL statements.
+"""
+import re
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.api.v1.analytics import _USAGE_METRICS_STMT, _ALERTS_STMT, _TENANT_ALERTS_STMT
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=asyncpg.dialect()))
+
+
+class TestUsageWindowBinds:
+    """Test window start parameters reach PostgreSQL with a type."""
+
+    @pytest.mark.parametrize("stmt", [_USAGE_METRICS_STMT, _ALERTS_STMT, _TENANT_ALERTS_STMT])
+    def test_date_trunc_argument_is_typed(self, stmt):
+        """Test date_trunc gets a timestamptz, not an ambiguous unknown."""
+        sql = _compile(stmt)
+
+        assert re.search(r"date_trunc\(\$\d+::VARCHAR, \$\d+::TIMESTAMP WITH TIME ZONE\)", sql)
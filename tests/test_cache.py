@@ -0,0 +1,205 @@
+"""
+Test the Redis response cache helpers.
+"""
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+from fakeredis import FakeAsyncRedis
+
+from app.core import cache
+
+
+class BrokenRedis:
+    """A client whose every command fails as if Redis were down."""
+
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise redis.ConnectionError("Redis is down")
+        return fail
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    # Runs the cache's Lua scripts for real (fakeredis[lua])
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(cache, "_redis_client", client)
+    return client
+
+
+@pytest.fixture
+def broken_redis(monkeypatch):
+    monkeypatch.setattr(cache, "_redis_client", BrokenRedis())
+
+
+class TestCacheInvalidation:
+    """Test namespace versioning."""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_moves_keys_to_new_version(self, fake_redis):
+        """Test entries written before an invalidation are no longer read."""
+        key = await cache.cache_key("projects", "list", 20)
+        await cache.cache_set(key, b"old", ttl=30)
+
+        await cache.cache_invalidate("projects")
+
+        new_key = await cache.cache_key("projects", "list", 20)
+        assert new_key != key
+        assert await cache.cache_get(new_key) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_leaves_other_namespaces(self, fake_redis):
+        """Test invalidating one namespace keeps another's keys."""
+        key = await cache.cache_key("tenants", "list")
+
+        await cache.cache_invalidate("projects")
+
+        assert await cache.cache_key("tenants", "list") == key
+
+
+class TestCacheIncrExisting:
+    """Test increments of cached counters."""
+
+    @pytest.mark.asyncio
+    async def test_missing_key_is_not_seeded(self, fake_redis):
+        """Test a missing counter stays missing."""
+        assert await cache.cache_incr_existing("count", 5) is None
+        assert await cache.cache_get("count") is None
+
+    @pytest.mark.asyncio
+    async def test_existing_key_is_incremented(self, fake_redis):
+        """Test a cached counter is incremented."""
+        await cache.cache_set("count", 2, ttl=30)
+
+        assert await cache.cache_incr_existing("count", 5) == 7
+
+
+class TestTakeToken:
+    """Test the token bucket rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_denies_when_bucket_empty(self, fake_redis, monkeypatch):
+        """Test calls beyond capacity are denied within the window."""
+        monkeypatch.setattr(cache.time, "time", lambda: 1000.0)
+
+        results = [await cache.take_token("bucket", 3, 60) for _ in range(4)]
+
+        assert results == [True, True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_refills_over_time(self, fake_redis, monkeypatch):
+        """Test tokens come back at capacity per window."""
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "time", lambda: now[0])
+        for _ in range(3):
+            assert await cache.take_token("bucket", 3, 60)
+        assert not await cache.take_token("bucket", 3, 60)
+
+        now[0] += 20  # One token's worth of the 60s window
+
+        assert await cache.take_token("bucket", 3, 60)
+        assert not await cache.take_token("bucket", 3, 60)
+
+
+class TestCoalesce:
+    """Test in-process request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test identical concurrent calls run the producer once."""
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "rows"
+
+        results = await asyncio.gather(
+            cache.coalesce("k", producer),
+            cache.coalesce("k", producer),
+            cache.coalesce("k", producer)
+        )
+
+        assert results == ["rows", "rows", "rows"]
+        assert calls == 1
+        assert "k" not in cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_caller(self):
+        """Test a producer failure is raised to all waiting callers."""
+        async def producer():
+            await asyncio.sleep(0.01)
+            raise ValueError("query failed")
+
+        results = await asyncio.gather(
+            cache.coalesce("k", producer),
+            cache.coalesce("k", producer),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert "k" not in cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_leader_cancelled(self):
+        """Test a waiter reruns the producer after the first caller is cancelled."""
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "rows"
+
+        leader = asyncio.ensure_future(cache.coalesce("k", producer))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.coalesce("k", producer))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await waiter == "rows"
+        assert calls == 2
+        assert "k" not in cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_leader_running(self):
+        """Test cancelling a waiter neither retries nor cancels the shared call."""
+        async def producer():
+            await asyncio.sleep(0.01)
+            return "rows"
+
+        leader = asyncio.ensure_future(cache.coalesce("k", producer))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.coalesce("k", producer))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await leader == "rows"
+
+
+class TestFailOpen:
+    """Test the helpers keep serving when Redis is down."""
+
+    @pytest.mark.asyncio
+    async def test_reads_and_writes(self, broken_redis):
+        """Test cache reads miss and writes are dropped."""
+        key = await cache.cache_key("projects", "list")
+
+        assert key == "projects:v0:list"
+        assert await cache.cache_get(key) is None
+        await cache.cache_set(key, b"body", ttl=30)
+        await cache.cache_delete(key)
+        await cache.cache_invalidate("projects")
+        assert await cache.cache_incr_existing(key, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_allows(self, broken_redis):
+        """Test the rate limiter lets calls through."""
+        assert await cache.take_token("bucket", 1, 60)
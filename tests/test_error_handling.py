@@ -0,0 +1,97 @@
+"""
+Test error handling utilities.
+"""
+import asyncio
+
+import pytest
+
+from app.core.error_handling import CircuitBreaker
+
+
+def _fail_sync():
+    raise ConnectionError("dependency down")
+
+
+async def _fail():
+    raise ConnectionError("dependency down")
+
+
+async def _succeed():
+    return "ok"
+
+
+def _open_breaker(timeout: float = 0) -> CircuitBreaker:
+    """A breaker that has just tripped and will admit a trial after timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, timeout=timeout)
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail_sync)
+    assert breaker.state == "OPEN"
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test the breaker opens and rejects calls after repeated failures."""
+        breaker = _open_breaker(timeout=60)
+
+        with pytest.raises(Exception, match="Circuit breaker is OPEN"):
+            breaker.call(lambda: "ok")
+
+    @pytest.mark.asyncio
+    async def test_successful_trial_closes(self):
+        """Test a successful half-open trial closes the breaker."""
+        breaker = _open_breaker()
+
+        assert await breaker.call_async(_succeed) == "ok"
+        assert breaker.state == "CLOSED"
+        assert breaker.failure_count == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_trial_reopens(self):
+        """Test a failed half-open trial opens the breaker again."""
+        breaker = _open_breaker()
+
+        with pytest.raises(ConnectionError):
+            await breaker.call_async(_fail)
+        assert breaker.state == "OPEN"
+
+    @pytest.mark.asyncio
+    async def test_half_open_admits_single_trial(self):
+        """Test concurrent callers are rejected while a trial is in flight."""
+        breaker = _open_breaker()
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        results = await asyncio.gather(
+            breaker.call_async(slow),
+            breaker.call_async(slow),
+            return_exceptions=True
+        )
+
+        assert results[0] == "ok"
+        assert "HALF_OPEN" in str(results[1])
+        assert breaker.state == "CLOSED"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_reopens(self):
+        """Test a cancelled half-open trial does not wedge the breaker."""
+        breaker = _open_breaker()
+
+        trial = asyncio.ensure_future(breaker.call_async(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        assert breaker.state == "HALF_OPEN"
+
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert breaker.state == "OPEN"
+        assert breaker.last_failure_time is not None
+
+        # The next caller after the timeout gets a fresh trial
+        assert await breaker.call_async(_succeed) == "ok"
+        assert breaker.state == "CLOSED"
@@ -0,0 +1,61 @@
+"""
+Test keyset pagination cursors.
+"""
+import base64
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+def _page(rows, limit, cursor=None):
+    """Newest-first page as the list endpoints query it, (created_at, id) < cursor."""
+    ordered = sorted(rows, key=lambda row: (row[0], row[1]), reverse=True)
+    if cursor:
+        position = decode_cursor(cursor)
+        ordered = [row for row in ordered if (row[0], row[1]) < position]
+    items = ordered[:limit]
+    next_cursor = encode_cursor(*items[-1]) if len(items) == limit else None
+    return items, next_cursor
+
+
+class TestCursor:
+    """Test cursor encoding and decoding."""
+
+    def test_round_trip(self):
+        """Test a decoded cursor gives back the row's position."""
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        row_id = uuid.uuid4()
+
+        assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+    @pytest.mark.parametrize("cursor", [
+        "not base64!",
+        base64.urlsafe_b64encode(b"no separator").decode(),
+        base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+        base64.urlsafe_b64encode(b"2026-03-01T12:00:00|not-a-uuid").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe|").decode(),
+    ])
+    def test_malformed_cursor_is_bad_request(self, cursor):
+        """Test a tampered cursor is rejected with 400 rather than a 500."""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+
+        assert exc_info.value.status_code == 400
+
+    def test_pages_do_not_overlap_on_created_at_ties(self):
+        """Test rows sharing a created_at are split across pages exactly once."""
+        tied = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        rows = [(tied, uuid.uuid4()) for _ in range(5)]
+        rows.append((datetime(2026, 2, 1, tzinfo=timezone.utc), uuid.uuid4()))
+
+        first, cursor = _page(rows, limit=3)
+        second, cursor = _page(rows, limit=3, cursor=cursor)
+        third, cursor = _page(rows, limit=3, cursor=cursor)
+
+        assert not set(first) & set(second)
+        assert sorted(first + second) == sorted(rows)
+        assert third == [] and cursor is None